@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Login con robot.connect e interpretación de sus respuestas, compartidos por los
+scripts de prueba
+"""
+
+import socket
+import time
+import xmlrpc.client
+from enum import IntEnum
+from typing import Any, Optional
+
+# Imports absolutos: mypyc (ver setup.py) no compila imports relativos en un
+# módulo de nivel superior
+from client_api import RobotRpcClient
+from config import MAX_RETRIES, RETRY_INTERVAL
+
+
+class UserRole(IntEnum):
+    """Roles de usuario según el servidor"""
+    OPERATOR = 0
+    ADMIN = 1
+
+
+# Rol y texto por código: evita construir el IntEnum en cada respuesta
+_ROLES: dict[int, tuple[UserRole, str]] = {
+    UserRole.OPERATOR.value: (UserRole.OPERATOR, "Operador"),
+    UserRole.ADMIN.value: (UserRole.ADMIN, "Administrador"),
+}
+
+
+def emit(log: Optional[list], message: str) -> None:
+    """Imprime el mensaje, o lo acumula en log para escribirlo después de una sola vez"""
+    if log is None:
+        print(message)
+    else:
+        log.append(message)
+
+
+def interpret_auth_result(result, username: str, password: str, log: Optional[list] = None) -> tuple[bool, dict]:
+    """
+    Interpreta la respuesta de robot.connect para un usuario
+    
+    El servidor devuelve un struct con:
+    - authenticated: bool
+    - role: int (0=OPERATOR, 1=ADMIN)
+    """
+    if not isinstance(result, dict):
+        emit(log, f"Error: Respuesta inesperada del servidor: {result}")
+        return False, {"authenticated": False}
+    
+    is_authenticated: bool = bool(result.get("authenticated", False))
+    if not is_authenticated:
+        emit(log, "Error: Usuario o clave incorrectos.")
+        return False, {"authenticated": False}
+    
+    # Sin tipo concreto: compilado con mypyc, "int" rechazaría roles que el
+    # diccionario acepta (p.ej. 1.0) con otro error
+    role_int: Any = result.get("role", 0)
+    role: UserRole
+    role_str: str
+    try:
+        role, role_str = _ROLES[role_int]
+    except KeyError:
+        # Mismo error que UserRole(role_int)
+        raise ValueError(f"{role_int!r} is not a valid UserRole") from None
+    
+    emit(log, f"¡Inicio de sesión exitoso! Bienvenido, {username} ({role_str}).")
+    
+    return True, {
+        "authenticated": True,
+        "username": username,
+        "password": password,  # En producción NO almacenar contraseñas
+        "role": role,
+        "role_str": role_str
+    }
+
+
+def interpret_auth_error(error: Exception, log: Optional[list] = None) -> tuple[bool, dict]:
+    """Informa el error (Fault, de conexión o inesperado) de una llamada a robot.connect"""
+    if isinstance(error, xmlrpc.client.Fault):
+        emit(log, f"[CLI] Error de autenticación RPC: {error.faultString}")
+    elif isinstance(error, OSError):
+        emit(log, f"[CLI] Error de conexión con el servidor: {error}")
+        emit(log, "Asegúrese de que el servidor esté corriendo ('make run').")
+    else:
+        emit(log, f"[CLI] Error inesperado: {type(error).__name__}: {error}")
+    return False, {"authenticated": False, "error": str(error)}
+
+
+# Errores de red que justifican reintentar (el servidor respondía pero la llamada se cortó)
+_TRANSIENT_ERRORS = (ConnectionResetError, BrokenPipeError, socket.timeout)
+
+
+def connect_with_retry(client: RobotRpcClient, username: str, password: str, retry_refused: bool = False):
+    """
+    Llama a robot.connect reintentando hasta MAX_RETRIES veces ante errores de red
+    transitorios, con espera exponencial (RETRY_INTERVAL, 2·RETRY_INTERVAL, ...)
+    
+    Los Fault no se reintentan: son errores de autenticación, no de red. Una conexión
+    rechazada solo se reintenta con retry_refused (el servidor ya respondió a la
+    verificación de conectividad); si no, se falla de inmediato.
+    """
+    retryable = _TRANSIENT_ERRORS + (ConnectionRefusedError,) if retry_refused else _TRANSIENT_ERRORS
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            return client.proxy.robot.connect(username, password)
+        except retryable:
+            if attempt == MAX_RETRIES:
+                raise
+            time.sleep(RETRY_INTERVAL * (2 ** attempt))
+
+
+def login_authenticate(client: RobotRpcClient, username: str, password: str,
+                       log: Optional[list] = None, retry_refused: bool = False) -> tuple[bool, dict]:
+    """
+    Autenticación usando robot.authenticate (método directo del servidor)
+    
+    Si se pasa log, los mensajes se agregan a esa lista en lugar de imprimirse.
+    Los errores de red transitorios se reintentan (ver connect_with_retry)
+    
+    Retorna:
+        tuple: (success: bool, info: dict)
+        info contiene: authenticated, role, username
+    """
+    try:
+        # Llamar directamente al método robot.authenticate
+        result = connect_with_retry(client, username, password, retry_refused)
+        return interpret_auth_result(result, username, password, log)
+    except Exception as e:
+        return interpret_auth_error(e, log)
@@ -1,15 +1,61 @@
 #!/usr/bin/env python3
+import atexit
 import socket
+import time
 import xmlrpc.client
-from typing import Any, List, Optional, Dict
+from typing import Any, List, Optional, Dict, Tuple
 
 # Imports flexibles
 try:
     from config import RPC_ENDPOINT, RPC_TIMEOUT
-    from models import Vector3, GCodeProgram
+    from models import Vector3, GCodeProgramSoA
 except ImportError:
     from .config import RPC_ENDPOINT, RPC_TIMEOUT
-    from .models import Vector3, GCodeProgram
+    from .models import Vector3, GCodeProgramSoA
+
+
+# Caché de resolución DNS compartida por la prueba de conectividad y el transporte RPC:
+# (host, puerto) -> (instante de expiración, resultado de getaddrinfo)
+_ADDR_CACHE: Dict[Tuple[str, int], Tuple[float, list]] = {}
+_ADDR_CACHE_TTL = 15 * 60  # segundos
+
+
+def resolve_address(host: str, port: int) -> list:
+    """Resuelve (host, puerto) con getaddrinfo, reutilizando el resultado durante _ADDR_CACHE_TTL"""
+    key = (host, port)
+    cached = _ADDR_CACHE.get(key)
+    now = time.monotonic()
+    if cached is not None and cached[0] > now:
+        return cached[1]
+    addresses = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    _ADDR_CACHE[key] = (now + _ADDR_CACHE_TTL, addresses)
+    return addresses
+
+
+def forget_address(host: str, port: int) -> None:
+    """Descarta la resolución guardada (p. ej. tras un fallo de conexión)"""
+    _ADDR_CACHE.pop((host, port), None)
+
+
+def create_connection(address: Tuple[str, int], timeout=None, source_address=None) -> socket.socket:
+    """Equivalente a socket.create_connection que usa la caché de resolve_address"""
+    host, port = address
+    error: Optional[OSError] = None
+    for family, socktype, proto, _, sockaddr in resolve_address(host, port):
+        sock = socket.socket(family, socktype, proto)
+        try:
+            # http.client pasa un centinela cuando no hay timeout explícito
+            if timeout is None or isinstance(timeout, (int, float)):
+                sock.settimeout(timeout)
+            if source_address:
+                sock.bind(source_address)
+            sock.connect(sockaddr)
+            return sock
+        except OSError as e:
+            error = e
+            sock.close()
+    forget_address(host, port)
+    raise error if error is not None else OSError(f"Sin direcciones para {host}:{port}")
 
 
 class RobotRpcClient:
@@ -17,19 +63,50 @@ class RobotRpcClient:
     Envoltura del ServerProxy XML-RPC con helpers y compatibilidad de nombres.
     """
 
-    def __init__(self, endpoint: str = RPC_ENDPOINT, timeout: int = RPC_TIMEOUT) -> None:
-        # Agregar timeout al transporte
-        class TimeoutTransport(xmlrpc.client.Transport):
-            def __init__(self, timeout: int):
+    def __init__(self, endpoint: str = RPC_ENDPOINT, timeout: float = RPC_TIMEOUT,
+                 prewarmed_socket: Optional[socket.socket] = None) -> None:
+        """
+        prewarmed_socket: socket TCP ya conectado al servidor (p. ej. el de la prueba de
+        conectividad) que se usa como primera conexión, ahorrando un handshake. Solo se
+        aprovecha con http:// y si apunta a la misma dirección; si no, se cierra.
+        """
+        # Agregar timeout al transporte. El transporte guarda su conexión HTTP/1.1 y la
+        # reutiliza en todas las llamadas (keep-alive) hasta close() o un error
+        secure = endpoint.lower().startswith("https:")
+        base = xmlrpc.client.SafeTransport if secure else xmlrpc.client.Transport
+
+        class TimeoutTransport(base):
+            def __init__(self, timeout: float, prewarmed_socket: Optional[socket.socket]):
                 super().__init__()
                 self.timeout = timeout
+                self.prewarmed_socket = prewarmed_socket
 
             def make_connection(self, host):
                 conn = super().make_connection(host)
                 conn.timeout = self.timeout
+                # Conectar con la resolución DNS en caché en lugar de socket.create_connection
+                conn._create_connection = create_connection
+                if self.prewarmed_socket is not None and conn.sock is None:
+                    self._adopt_prewarmed_socket(conn)
                 return conn
 
-        transport = TimeoutTransport(timeout)
+            def _adopt_prewarmed_socket(self, conn):
+                sock, self.prewarmed_socket = self.prewarmed_socket, None
+                try:
+                    peer = sock.getpeername()
+                    if any(peer == sockaddr for *_, sockaddr in resolve_address(conn.host, conn.port)):
+                        sock.settimeout(self.timeout)
+                        conn.sock = sock  # http.client no vuelve a llamar a connect()
+                        return
+                except OSError:
+                    pass
+                sock.close()
+
+        if secure and prewarmed_socket is not None:
+            # El socket no tiene TLS: no sirve para https
+            prewarmed_socket.close()
+            prewarmed_socket = None
+        transport = TimeoutTransport(timeout, prewarmed_socket)
         self.proxy = xmlrpc.client.ServerProxy(endpoint, transport=transport, allow_none=True)
         self.session_id: Optional[str] = None
         self.username: Optional[str] = None
@@ -81,6 +158,10 @@ class RobotRpcClient:
         self.password = None
         self.role = None
 
+    def close(self) -> None:
+        """Cierra la conexión persistente con el servidor (se reabre sola en la próxima llamada)"""
+        self.proxy("close")()
+
     def _sid(self) -> str:
         """Retorna session_id (compatibilidad), pero el servidor usa username/password"""
         if not self.session_id:
@@ -144,7 +225,7 @@ class RobotRpcClient:
     def upload_program(self, path: str, owner_user_id: str = "") -> Dict[str, Any]:
         username, password = self._credentials()
         # Usar addTask en lugar de uploadProgram
-        program = GCodeProgram.load_from_file(path, owner_user_id=owner_user_id)
+        program = GCodeProgramSoA.load_from_file(path, owner_user_id=owner_user_id)
         return self.proxy.robot.addTask(username, password, program.to_rpc())
 
     def run_program(self, program_id: str) -> Dict[str, Any]:
@@ -153,4 +234,28 @@ class RobotRpcClient:
 
     def list_programs(self) -> List[Any]:
         username, password = self._credentials()
-        return self.proxy.robot.listTasks(username, password)
\ No newline at end of file
+        return self.proxy.robot.listTasks(username, password)
+
+
+# Clientes compartidos por endpoint: las conexiones keep-alive sobreviven entre usos
+# dentro del mismo proceso y se cierran al salir
+_CLIENT_POOL: Dict[str, RobotRpcClient] = {}
+
+
+def get_client(endpoint: str = RPC_ENDPOINT, prewarmed_socket: Optional[socket.socket] = None) -> RobotRpcClient:
+    """
+    Devuelve el cliente compartido del endpoint, creándolo la primera vez.
+    Si el cliente ya existía, prewarmed_socket no hace falta y se cierra.
+    """
+    client = _CLIENT_POOL.get(endpoint)
+    if client is None:
+        client = _CLIENT_POOL[endpoint] = RobotRpcClient(endpoint, prewarmed_socket=prewarmed_socket)
+    elif prewarmed_socket is not None:
+        prewarmed_socket.close()
+    return client
+
+
+@atexit.register
+def _close_pooled_clients() -> None:
+    for client in _CLIENT_POOL.values():
+        client.close()
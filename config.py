@@ -7,5 +7,13 @@ import os
 #   - Servidor remoto: "http://10.68.4.101:8080/RPC2"    "http://192.168.1.125:8080/RPC2"
 RPC_ENDPOINT = os.getenv("ROBOT_RPC_ENDPOINT", "http://localhost:8080/RPC2")
 
-# Timeout de socket (segundos)
-RPC_TIMEOUT = int(os.getenv("ROBOT_RPC_TIMEOUT", "30"))
\ No newline at end of file
+# Timeout de socket de cada llamada RPC (segundos)
+RPC_TIMEOUT = float(os.getenv("ROBOT_RPC_TIMEOUT", "30"))
+
+# Timeout de la prueba de conectividad TCP previa al login (segundos)
+PROBE_TIMEOUT = float(os.getenv("ROBOT_PROBE_TIMEOUT", "2.0"))
+
+# Reintentos del login ante errores de red transitorios (espera inicial en segundos,
+# se duplica en cada reintento)
+MAX_RETRIES = int(os.getenv("ROBOT_MAX_RETRIES", "2"))
+RETRY_INTERVAL = float(os.getenv("ROBOT_RETRY_INTERVAL", "0.25"))
\ No newline at end of file
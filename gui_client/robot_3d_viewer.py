@@ -7,17 +7,586 @@ Simula el movimiento del brazo robótico basado en coordenadas.
 import pygame
 from pygame.locals import *
 from OpenGL.GL import *
-from OpenGL.GLU import *
+from OpenGL.GL.shaders import compileProgram, compileShader
+import numpy as np
+import ctypes
 import math
+import re
 import threading
 import time
 
+try:
+    from numba import njit
+except ImportError:
+    # Numba es opcional: sin él la cinemática inversa se ejecuta en Python puro
+    def njit(*args, **kwargs):
+        def decorator(func):
+            return func
+        return decorator
+
 try:
     from viewer_3d_config import *
 except ImportError:
     # Error: archivo de configuración requerido
     raise ImportError("El archivo viewer_3d_config.py es requerido para el funcionamiento del visualizador 3D")
 
+# Factores de conversión angular (evitan llamadas a math.degrees/math.radians)
+_RAD2DEG = 180.0 / math.pi
+_DEG2RAD = math.pi / 180.0
+
+# Parámetro G-code completo (letra + número), p. ej. "X100" o "Z-12.5"
+_GCODE_PARAM = re.compile(r'(?<!\S)([A-Z])([-+]?(?:\d+\.?\d*|\.\d+)(?:E[-+]?\d+)?)(?!\S)')
+
+# Shaders de las piezas del robot: iluminación por fragmento equivalente a la
+# del pipeline fijo (GL_COLOR_MATERIAL con ambiente y difusa, sin especular).
+# Las matrices modelo-vista y de proyección llegan como uniforms (orden de columnas).
+_MESH_VERTEX_SHADER = """
+#version 330 core
+layout(location = 0) in vec3 a_position;
+layout(location = 1) in vec3 a_normal;
+// Los atributos opcionales usan índices que ningún driver asocia a gl_Normal,
+// gl_Color, etc. (2, 3, 8-15 lo hacen en NVIDIA): su valor fijo no lo cambia el
+// dibujo de la cuadrícula con glInterleavedArrays.
+// Desplazamiento por instancia (vale 0 cuando el atributo no está habilitado)
+layout(location = 6) in vec3 a_offset;
+// Color por vértice de las mallas pre-coloreadas (vale 1 cuando no está habilitado)
+layout(location = 7) in vec3 a_color;
+uniform mat4 u_model_view;
+uniform mat4 u_projection;
+out vec3 v_position;
+out vec3 v_normal;
+out vec3 v_color;
+
+void main() {
+    vec4 eye_position = u_model_view * vec4(a_position + a_offset, 1.0);
+    v_position = eye_position.xyz;
+    // Matriz de normales: las mallas unitarias se escalan de forma no uniforme
+    v_normal = transpose(inverse(mat3(u_model_view))) * a_normal;
+    v_color = a_color;
+    gl_Position = u_projection * eye_position;
+}
+"""
+
+_MESH_FRAGMENT_SHADER = """
+#version 330 core
+in vec3 v_position;
+in vec3 v_normal;
+in vec3 v_color;
+uniform vec3 u_color;
+uniform vec3 u_light_position;
+uniform vec3 u_ambient;
+uniform vec3 u_diffuse;
+layout(location = 0) out vec4 frag_color;
+
+void main() {
+    vec3 normal = normalize(v_normal);
+    vec3 light_dir = normalize(u_light_position - v_position);
+    vec3 light = u_ambient + u_diffuse * max(dot(normal, light_dir), 0.0);
+    frag_color = vec4(clamp(u_color * v_color * light, 0.0, 1.0), 1.0);
+}
+"""
+
+# Esferas como impostores: un cuadrado orientado a la cámara en el que el shader de
+# fragmentos calcula la intersección rayo-esfera (posición, normal y profundidad exactas)
+_SPHERE_VERTEX_SHADER = """
+#version 330 core
+layout(location = 0) in vec2 a_corner;
+uniform vec3 u_center;
+uniform float u_radius;
+uniform mat4 u_projection;
+out vec3 v_ray;
+
+void main() {
+    // Cuadrado perpendicular al rayo cámara-centro, del tamaño justo para cubrir la silueta
+    vec3 forward = normalize(u_center);
+    vec3 helper = abs(forward.y) < 0.99 ? vec3(0.0, 1.0, 0.0) : vec3(1.0, 0.0, 0.0);
+    vec3 right = normalize(cross(forward, helper));
+    vec3 up = cross(right, forward);
+    float size = u_radius * inversesqrt(max(1.0 - u_radius * u_radius / dot(u_center, u_center), 1e-4));
+    v_ray = u_center + (a_corner.x * right + a_corner.y * up) * size;
+    gl_Position = u_projection * vec4(v_ray, 1.0);
+}
+"""
+
+_SPHERE_FRAGMENT_SHADER = """
+#version 330 core
+in vec3 v_ray;
+uniform vec3 u_center;
+uniform float u_radius;
+uniform mat4 u_projection;
+uniform vec3 u_color;
+uniform vec3 u_light_position;
+uniform vec3 u_ambient;
+uniform vec3 u_diffuse;
+layout(location = 0) out vec4 frag_color;
+
+void main() {
+    // Rayo desde la cámara (origen): t^2 - 2 t (rayo·c) + |c|^2 - r^2 = 0. El discriminante
+    // se calcula con la distancia del centro al rayo para no perder precisión en esferas chicas
+    vec3 ray = normalize(v_ray);
+    float along = dot(ray, u_center);
+    vec3 closest = u_center - along * ray;
+    float disc = u_radius * u_radius - dot(closest, closest);
+    if (disc < 0.0)
+        discard;
+    vec3 position = ray * (along - sqrt(disc));
+    vec3 normal = (position - u_center) / u_radius;
+    vec3 light_dir = normalize(u_light_position - position);
+    vec3 light = u_ambient + u_diffuse * max(dot(normal, light_dir), 0.0);
+    frag_color = vec4(clamp(u_color * light, 0.0, 1.0), 1.0);
+    vec4 clip = u_projection * vec4(position, 1.0);
+    gl_FragDepth = 0.5 * clip.z / clip.w + 0.5;
+}
+"""
+
+# Esquinas del cuadrado de los impostores (GL_TRIANGLE_STRIP)
+_SPHERE_QUAD = np.array(((-1.0, -1.0), (1.0, -1.0), (-1.0, 1.0), (1.0, 1.0)), dtype=np.float32)
+
+# Ambiente global por defecto de OpenGL (GL_LIGHT_MODEL_AMBIENT)
+_GLOBAL_AMBIENT = (0.2, 0.2, 0.2)
+
+# Distribución de un vértice GL_N3F_V3F: normal (offset 0) y posición (offset 12)
+_N3F_V3F_STRIDE = 6 * 4
+_N3F_V3F_POSITION_OFFSET = ctypes.c_void_p(3 * 4)
+_N3F_V3F_NORMAL_OFFSET = ctypes.c_void_p(0)
+
+# Mallas pre-coloreadas: GL_N3F_V3F seguido del color RGB (offset 24)
+_COLORED_MESH_STRIDE = 9 * 4
+_COLORED_MESH_COLOR_OFFSET = ctypes.c_void_p(6 * 4)
+
+
+def _build_cylinder_mesh(segments=CYLINDER_SEGMENTS):
+    """
+    Genera un cilindro unitario (radio 1, altura 1 sobre +Z) como malla indexada
+    de triángulos.
+
+    El lateral comparte sus vértices entre caras vecinas; las tapas usan anillos
+    propios para conservar las normales planas en los bordes.
+
+    Returns:
+        tuple: (vértices normal+posición intercalados (GL_N3F_V3F) float32 de forma
+                (4*segments+2, 6), índices uint16 de forma (12*segments,))
+    """
+    angles = np.linspace(0.0, 2.0 * math.pi, segments, endpoint=False)
+    cos_a = np.cos(angles)
+    sin_a = np.sin(angles)
+
+    # Lateral: anillo inferior (2i) y superior (2i+1), normal radial
+    side = np.zeros((segments, 2, 6), dtype=np.float32)
+    side[:, :, 0] = cos_a[:, None]
+    side[:, :, 1] = sin_a[:, None]
+    side[:, :, 3] = cos_a[:, None]
+    side[:, :, 4] = sin_a[:, None]
+    side[:, 1, 5] = 1.0
+
+    # Tapas inferior y superior: centro seguido del anillo
+    caps = []
+    for z, normal_z in ((0.0, -1.0), (1.0, 1.0)):
+        cap = np.zeros((segments + 1, 6), dtype=np.float32)
+        cap[:, 2] = normal_z
+        cap[:, 5] = z
+        cap[1:, 3] = cos_a
+        cap[1:, 4] = sin_a
+        caps.append(cap)
+
+    i = np.arange(segments, dtype=np.uint16)
+    j = (i + 1) % segments
+    side_indices = np.stack([2*i, 2*j, 2*i + 1, 2*i + 1, 2*j, 2*j + 1], axis=-1)
+    cap_indices = []
+    for center in (2 * segments, 3 * segments + 1):
+        cap_indices.append(np.stack([np.full_like(i, center), center + 1 + i, center + 1 + j], axis=-1))
+
+    vertices = np.vstack([side.reshape(-1, 6)] + caps)
+    indices = np.concatenate([side_indices.reshape(-1)] + [c.reshape(-1) for c in cap_indices])
+    return vertices, indices.astype(np.uint16)
+
+
+def _bake_cylinders(parts, segments=CYLINDER_SEGMENTS):
+    """
+    Une varios cilindros ya colocados en una sola malla indexada con color por vértice.
+
+    Args:
+        parts: lista de (matriz 4x4 en orden de columnas con traslación y escala, color RGB)
+
+    Returns:
+        tuple: (vértices normal+posición+color float32 de forma (n, 9), índices uint16)
+    """
+    unit_vertices, unit_indices = _build_cylinder_mesh(segments)
+    normals = unit_vertices[:, :3]
+    positions = unit_vertices[:, 3:]
+    vertices = []
+    indices = []
+    for k, (matrix, color) in enumerate(parts):
+        linear = matrix[:3, :3]
+        placed = np.empty((len(unit_vertices), 9), dtype=np.float32)
+        # Las normales se transforman con la inversa traspuesta (la escala no es uniforme)
+        normal = normals @ np.linalg.inv(linear).T
+        placed[:, :3] = normal / np.linalg.norm(normal, axis=1, keepdims=True)
+        placed[:, 3:6] = positions @ linear + matrix[3, :3]
+        placed[:, 6:] = color
+        vertices.append(placed)
+        indices.append(unit_indices + k * len(unit_vertices))
+    return np.vstack(vertices), np.concatenate(indices).astype(np.uint16)
+
+
+def _build_grid_lines():
+    """
+    Genera los segmentos de la cuadrícula del suelo (plano XZ, Y=0).
+
+    Returns:
+        tuple: (líneas de la cuadrícula, líneas centrales) como arrays float32 (N, 3)
+    """
+    steps = np.arange(-GRID_SIZE, GRID_SIZE + 1, GRID_SPACING, dtype=np.float32)
+    grid = np.zeros((len(steps), 4, 3), dtype=np.float32)
+    # Líneas paralelas al eje X (en plano XZ)
+    grid[:, 0, 0] = steps
+    grid[:, 0, 2] = -GRID_SIZE
+    grid[:, 1, 0] = steps
+    grid[:, 1, 2] = GRID_SIZE
+    # Líneas paralelas al eje Z (en plano XZ)
+    grid[:, 2, 0] = -GRID_SIZE
+    grid[:, 2, 2] = steps
+    grid[:, 3, 0] = GRID_SIZE
+    grid[:, 3, 2] = steps
+
+    main = np.array([
+        (-GRID_SIZE, 0.0, 0.0), (GRID_SIZE, 0.0, 0.0),  # Línea central X
+        (0.0, 0.0, -GRID_SIZE), (0.0, 0.0, GRID_SIZE),  # Línea central Z
+    ], dtype=np.float32)
+    return grid.reshape(-1, 3), main
+
+
+def _build_axis_lines():
+    """
+    Genera los ejes de coordenadas y sus marcas de graduación como vértices
+    intercalados color+posición (formato GL_C3F_V3F).
+
+    Returns:
+        tuple: (array float32 (N, 6), cantidad de vértices de los ejes principales)
+    """
+    axis_colors = (AXIS_X_COLOR, AXIS_Y_COLOR, AXIS_Z_COLOR)
+    vertices = []
+
+    # Ejes principales: X horizontal derecha, Y vertical arriba, Z adelante/atrás
+    for axis, color in enumerate(axis_colors):
+        end = [0.0, 0.0, 0.0]
+        end[axis] = AXIS_LENGTH
+        vertices.append((*color, 0.0, 0.0, 0.0))
+        vertices.append((*color, *end))
+    axes = np.array(vertices, dtype=np.float32)
+
+    # Marcas de graduación (cada AXIS_MARKS_INTERVAL unidades), perpendiculares a cada eje;
+    # las marcas principales (donde hay número) son más largas
+    positions = np.arange(AXIS_MARKS_INTERVAL, AXIS_LENGTH + 1, AXIS_MARKS_INTERVAL, dtype=np.float32)
+    sizes = np.where(positions % AXIS_NUMBERS_INTERVAL == 0, AXIS_MARKS_SIZE * 1.5, AXIS_MARKS_SIZE)
+    signed_sizes = sizes[:, None] * np.array((-1.0, 1.0))
+
+    marks = []
+    for axis, color in enumerate(axis_colors):
+        # Por marca: 2 ejes perpendiculares x 2 extremos, color+posición
+        axis_marks = np.zeros((len(positions), 2, 2, 6), dtype=np.float32)
+        axis_marks[..., :3] = np.asarray(color) * 0.8
+        axis_marks[..., 3 + axis] = positions[:, None, None]
+        perpendicular = [a for a in range(3) if a != axis]
+        for k, other in enumerate(perpendicular):
+            axis_marks[:, k, :, 3 + other] = signed_sizes
+        marks.append(axis_marks.reshape(-1, 6))
+
+    return np.vstack([axes] + marks), len(axes)
+
+
+# Segmentos (x1, y1, x2, y2) de cada dígito en una celda unitaria
+_DIGIT_SEGMENTS = {
+    '0': ((0, 0, 1, 0),        # base
+          (0, 1, 1, 1),        # top
+          (0, 0, 0, 1),        # left
+          (1, 0, 1, 1)),       # right
+    '1': ((0.5, 0, 0.5, 1),    # vertical
+          (0.3, 0.8, 0.5, 1)), # top angle
+    '2': ((0, 1, 1, 1),        # top
+          (1, 1, 1, 0.5),      # right top
+          (1, 0.5, 0, 0.5),    # middle
+          (0, 0.5, 0, 0),      # left bottom
+          (0, 0, 1, 0)),       # bottom
+    '3': ((0, 1, 1, 1),        # top
+          (1, 1, 1, 0),        # right
+          (0, 0.5, 1, 0.5),    # middle
+          (0, 0, 1, 0)),       # bottom
+    '4': ((0, 1, 0, 0.5),      # left top
+          (0, 0.5, 1, 0.5),    # middle
+          (1, 1, 1, 0)),       # right
+    '5': ((0, 1, 1, 1),        # top
+          (0, 1, 0, 0.5),      # left top
+          (0, 0.5, 1, 0.5),    # middle
+          (1, 0.5, 1, 0),      # right bottom
+          (1, 0, 0, 0)),       # bottom
+}
+
+
+def _build_axis_labels(label_size=0.6):
+    """
+    Genera las etiquetas numéricas de los ejes como segmentos GL_LINES con
+    vértices intercalados color+posición (formato GL_C3F_V3F).
+
+    Las etiquetas son estáticas, por lo que se teselan una sola vez al iniciar.
+    """
+    axis_colors = (AXIS_X_COLOR, AXIS_Y_COLOR, AXIS_Z_COLOR)
+    vertices = []
+
+    # X (rojo), Y (verde) - vertical, Z (azul) - profundidad
+    for axis, color in enumerate(axis_colors):
+        for i in range(AXIS_NUMBERS_INTERVAL, AXIS_LENGTH + 1, AXIS_NUMBERS_INTERVAL):
+            origin = [-1.0, -1.0, -1.0]
+            origin[axis] = i
+            ox, oy, oz = origin
+            for index, digit in enumerate(str(i)):
+                offset_x = index * 1.2  # Espaciado entre dígitos
+                for x1, y1, x2, y2 in _DIGIT_SEGMENTS.get(digit, ()):
+                    vertices.append((*color, ox + (offset_x + x1) * label_size, oy + y1 * label_size, oz))
+                    vertices.append((*color, ox + (offset_x + x2) * label_size, oy + y2 * label_size, oz))
+
+    return np.array(vertices, dtype=np.float32).reshape(-1, 6)
+
+
+def _with_color(positions, color):
+    """Intercala un color fijo con posiciones (N, 3) en formato GL_C3F_V3F."""
+    colors = np.broadcast_to(np.asarray(color, dtype=np.float32), positions.shape)
+    return np.hstack((colors, positions))
+
+
+def _build_line_batches():
+    """
+    Agrupa todas las líneas estáticas de la escena (cuadrícula, ejes, marcas y
+    etiquetas) por grosor, en un único buffer GL_C3F_V3F.
+
+    Returns:
+        tuple: (array float32 (N, 6), tupla de (grosor, primer vértice, cantidad))
+    """
+    grid, grid_main = _build_grid_lines()
+    axes, axes_count = _build_axis_lines()
+    labels = _build_axis_labels()
+
+    width_groups = (
+        (1.0, (_with_color(grid, GRID_COLOR),)),
+        # Líneas principales de la cuadrícula y marcas de graduación
+        (2.0, (_with_color(grid_main, GRID_MAIN_COLOR), axes[axes_count:])),
+        # Ejes principales y etiquetas de valores
+        (3.0, (axes[:axes_count], labels)),
+    )
+
+    parts = []
+    batches = []
+    first = 0
+    for width, group in width_groups:
+        count = sum(len(part) for part in group)
+        parts.extend(group)
+        batches.append((width, first, count))
+        first += count
+    return np.concatenate(parts).astype(np.float32), tuple(batches)
+
+
+def _upload_buffer(target, data):
+    """Crea un buffer de OpenGL con datos estáticos y devuelve su identificador."""
+    buffer_id = glGenBuffers(1)
+    glBindBuffer(target, buffer_id)
+    glBufferData(target, data.nbytes, data, GL_STATIC_DRAW)
+    glBindBuffer(target, 0)
+    return buffer_id
+
+
+def _create_mesh_vao(vbo, ebo=None, colored=False):
+    """
+    Crea un VAO con los atributos posición (0) y normal (1) de un buffer GL_N3F_V3F,
+    más el color por vértice (7) si la malla es pre-coloreada.
+    """
+    stride = _COLORED_MESH_STRIDE if colored else _N3F_V3F_STRIDE
+    vao = glGenVertexArrays(1)
+    glBindVertexArray(vao)
+    glBindBuffer(GL_ARRAY_BUFFER, vbo)
+    glEnableVertexAttribArray(0)
+    glVertexAttribPointer(0, 3, GL_FLOAT, GL_FALSE, stride, _N3F_V3F_POSITION_OFFSET)
+    glEnableVertexAttribArray(1)
+    glVertexAttribPointer(1, 3, GL_FLOAT, GL_FALSE, stride, _N3F_V3F_NORMAL_OFFSET)
+    if colored:
+        glEnableVertexAttribArray(7)
+        glVertexAttribPointer(7, 3, GL_FLOAT, GL_FALSE, stride, _COLORED_MESH_COLOR_OFFSET)
+    if ebo is not None:
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, ebo)
+    glBindVertexArray(0)
+    glBindBuffer(GL_ARRAY_BUFFER, 0)
+    if ebo is not None:
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+    return vao
+
+
+def _add_instance_offsets(vao, offsets):
+    """Agrega al VAO un buffer de desplazamientos por instancia (atributo 6)."""
+    vbo = _upload_buffer(GL_ARRAY_BUFFER, np.asarray(offsets, dtype=np.float32))
+    glBindVertexArray(vao)
+    glBindBuffer(GL_ARRAY_BUFFER, vbo)
+    glEnableVertexAttribArray(6)
+    glVertexAttribPointer(6, 3, GL_FLOAT, GL_FALSE, 0, None)
+    glVertexAttribDivisor(6, 1)
+    glBindVertexArray(0)
+    glBindBuffer(GL_ARRAY_BUFFER, 0)
+    return vbo
+
+
+def _look_at(eye, center, up):
+    """Equivalente NumPy de gluLookAt: devuelve la matriz de vista 4x4 (fila mayor)."""
+    eye = np.asarray(eye, dtype=np.float64)
+    forward = np.asarray(center, dtype=np.float64) - eye
+    forward /= np.linalg.norm(forward)
+    side = np.cross(forward, up)
+    side /= np.linalg.norm(side)
+    true_up = np.cross(side, forward)
+
+    view = np.identity(4)
+    view[0, :3] = side
+    view[1, :3] = true_up
+    view[2, :3] = -forward
+    view[:3, 3] = -view[:3, :3] @ eye
+    return view
+
+
+def _perspective(fovy, aspect, near, far):
+    """Equivalente NumPy de gluPerspective: devuelve la matriz de proyección 4x4 (fila mayor)."""
+    f = 1.0 / math.tan(fovy * _DEG2RAD / 2.0)
+    projection = np.zeros((4, 4))
+    projection[0, 0] = f / aspect
+    projection[1, 1] = f
+    projection[2, 2] = (far + near) / (near - far)
+    projection[2, 3] = 2.0 * far * near / (near - far)
+    projection[3, 2] = -1.0
+    return projection
+
+
+# Las matrices del modelo se guardan en orden de columnas (como las esperan
+# glLoadMatrixf y glUniformMatrix4fv): la fila i del array es la columna i.
+
+def _rotation_matrix(angle, x, y, z):
+    """Matriz de rotación 3x3 equivalente a glRotatef(angle, x, y, z)."""
+    norm = math.sqrt(x*x + y*y + z*z)
+    x, y, z = x / norm, y / norm, z / norm
+    c = math.cos(angle * _DEG2RAD)
+    s = math.sin(angle * _DEG2RAD)
+    t = 1.0 - c
+    return np.array(((x*x*t + c,   x*y*t - z*s, x*z*t + y*s),
+                     (y*x*t + z*s, y*y*t + c,   y*z*t - x*s),
+                     (x*z*t - y*s, y*z*t + x*s, z*z*t + c)), dtype=np.float32)
+
+
+def _mat_translate(matrix, x, y, z):
+    """Aplica glTranslatef(x, y, z) sobre la matriz (en el lugar)."""
+    matrix[3] += x * matrix[0] + y * matrix[1] + z * matrix[2]
+
+
+def _mat_rotate(matrix, angle, x, y, z):
+    """Aplica glRotatef(angle, x, y, z) sobre la matriz (en el lugar)."""
+    matrix[:3] = _rotation_matrix(angle, x, y, z).T @ matrix[:3]
+
+
+def _mat_place(matrix, x, y, z, sx, sy, sz):
+    """Devuelve una copia de la matriz trasladada a (x, y, z) y escalada por (sx, sy, sz)."""
+    placed = matrix.copy()
+    _mat_translate(placed, x, y, z)
+    placed[0] *= sx
+    placed[1] *= sy
+    placed[2] *= sz
+    return placed
+
+
+def _shade(color, factor):
+    """Devuelve el color RGB multiplicado por un factor de sombreado."""
+    return (color[0] * factor, color[1] * factor, color[2] * factor)
+
+
+def _arm_shades(color):
+    """Variantes del color de un brazo: (secciones alternas, anillos de unión)."""
+    return _shade(color, 0.9), _shade(color, 0.7)
+
+
+# Variantes sombreadas precalculadas de los colores de los brazos
+_ARM_SHADES = {
+    color: _arm_shades(color)
+    for color in (MOTORS_ON_LOWER_ARM, MOTORS_ON_UPPER_ARM,
+                  MOTORS_OFF_LOWER_ARM, MOTORS_OFF_UPPER_ARM)
+}
+
+
+# Direcciones (cos, sin) de los 3 cables que recorren cada brazo
+_CABLE_COUNT = 3
+_CABLE_OFFSETS = tuple(
+    (math.cos(2 * math.pi * i / _CABLE_COUNT), math.sin(2 * math.pi * i / _CABLE_COUNT))
+    for i in range(_CABLE_COUNT)
+)
+
+# Direcciones (cos, sin) de los 6 pernos de cada articulación
+_JOINT_BOLT_COUNT = 6
+_JOINT_BOLT_DIRECTIONS = tuple(
+    (math.cos(2 * math.pi * i / _JOINT_BOLT_COUNT), math.sin(2 * math.pi * i / _JOINT_BOLT_COUNT))
+    for i in range(_JOINT_BOLT_COUNT)
+)
+
+
+# Rotación global del robot: -90° en X para que la base apoye en el suelo (plano XZ)
+_ROBOT_ORIENTATION = np.identity(4, dtype=np.float32)
+_mat_rotate(_ROBOT_ORIENTATION, -90, 1, 0, 0)
+
+
+@njit(cache=True, fastmath=True)
+def _ik(x, y, z, lower_len, upper_len, base_h):
+    """
+    Cinemática inversa del brazo (X=horizontal derecha, Y=vertical arriba, Z=profundidad).
+
+    Returns:
+        tuple: (rotación de la base, ángulo brazo inferior, ángulo brazo superior) en grados
+    """
+    # Ángulo de rotación de la base (rotación en plano XZ)
+    rotation_angle = math.atan2(x, z) * _RAD2DEG if z != 0.0 or x != 0.0 else 0.0
+
+    # Distancia horizontal desde el centro (en plano XZ)
+    horizontal_dist = math.hypot(x, z)
+
+    # Altura desde la base (Y - base_height)
+    vertical_dist = y - base_h
+    if vertical_dist < 0.0:
+        vertical_dist = 0.0  # No permitir posiciones bajo la base
+
+    # Distancia total al objetivo
+    target_dist = math.hypot(horizontal_dist, vertical_dist)
+
+    # Verificar si la posición es alcanzable
+    max_reach = lower_len + upper_len
+    if target_dist > max_reach:
+        # Si no es alcanzable, escalar la posición
+        scale = max_reach / target_dist
+        horizontal_dist *= scale
+        vertical_dist *= scale
+        target_dist = max_reach
+
+    if target_dist == 0.0 or lower_len == 0.0 or upper_len == 0.0:
+        # Posición degenerada: usar ángulos por defecto
+        return rotation_angle, 45.0, 90.0
+
+    # Ángulo del brazo inferior usando ley de cosenos (cuadrados compartidos con el superior)
+    lower_sq = lower_len * lower_len
+    upper_sq = upper_len * upper_len
+    target_sq = target_dist * target_dist
+    cos_lower = (lower_sq + target_sq - upper_sq) / (2.0 * lower_len * target_dist)
+    cos_lower = max(-1.0, min(1.0, cos_lower))  # Clamp entre -1 y 1
+
+    angle_to_target = math.atan2(vertical_dist, horizontal_dist) * _RAD2DEG
+    lower_arm_angle = angle_to_target - math.acos(cos_lower) * _RAD2DEG
+
+    # Ángulo del brazo superior
+    cos_upper = (lower_sq + upper_sq - target_sq) / (2.0 * lower_len * upper_len)
+    cos_upper = max(-1.0, min(1.0, cos_upper))
+    upper_arm_angle = 180.0 - math.acos(cos_upper) * _RAD2DEG
+
+    return rotation_angle, lower_arm_angle, upper_arm_angle
+
+
 class Robot3DViewer:
     def __init__(self, width=WINDOW_WIDTH, height=WINDOW_HEIGHT):
         """
@@ -40,12 +609,14 @@ class Robot3DViewer:
         
         # Posición inicial del robot (posición home) - Ajustada para nueva orientación
         # Ahora Y es vertical, Z es profundidad
-        self.robot_position = [0.0, self.lower_arm_length + self.upper_arm_length + self.effector_length, 0.0]
-        self.target_position = [0.0, self.lower_arm_length + self.upper_arm_length + self.effector_length, 0.0]
+        self.robot_position = np.array([0.0, self.lower_arm_length + self.upper_arm_length + self.effector_length, 0.0], dtype=np.float32)
+        self.target_position = self.robot_position.copy()
         
         # Variables de animación
         self.animation_progress = 1.0  # 1.0 = movimiento completo
         self.animation_speed = ANIMATION_SPEED
+        self._anim_done = threading.Event()  # Activo cuando no hay animación en curso
+        self._anim_done.set()
         
         # Variables de cámara (desde configuración)
         self.camera_rotation = CAMERA_INITIAL_ROTATION.copy()
@@ -56,15 +627,71 @@ class Robot3DViewer:
         self.effector_active = False
         
         # Posición home del robot - Ajustada para nueva orientación
-        self.home_position = [0.0, self.lower_arm_length + self.upper_arm_length + self.effector_length, 0.0]
+        self.home_position = self.robot_position.copy()
         
         # Variables para ejecutar G-code
         self.is_executing_gcode = False
         self.gcode_queue = []
-        self.current_position = [0.0, self.lower_arm_length + self.upper_arm_length + self.effector_length, 0.0]
+        self.current_position = self.robot_position.copy()
         self.coordinate_mode = 'absolute'  # 'absolute' o 'relative'
         self.gcode_execution_speed = 2.0  # Velocidad de ejecución (segundos por comando)
         
+        # Posiciones (x, y) y tamaño de los 8 pernos decorativos de la base
+        self._bolt_radius = 1.2 * JOINT_SIZE_FACTOR  # Pernos escalados
+        self._bolt_height = 3.0 * JOINT_SIZE_FACTOR  # Altura escalada
+        bolt_count = 8
+        bolt_circle_radius = BASE_RADIUS * 0.7
+        self._bolt_xy = tuple(
+            (bolt_circle_radius * math.cos(2 * math.pi * i / bolt_count),
+             bolt_circle_radius * math.sin(2 * math.pi * i / bolt_count))
+            for i in range(bolt_count)
+        )
+        
+        # Cámara en caché: posición y matriz de vista (orden de columnas, lista para
+        # glLoadMatrixf); _cam_dirty indica que hay que recalcularlas
+        self._camera_position = (0.0, 0.0, 0.0)
+        self._view = np.identity(4, dtype=np.float32)
+        self._cam_dirty = True
+        
+        # Indica que la escena cambió y hay que volver a dibujarla
+        self._dirty = True
+        
+        # Pila de matrices del modelo del robot, calculada en NumPy (orden de columnas)
+        self._model_stack = []
+        
+        # Cuadrícula, ejes, marcas y etiquetas en GPU (color+posición intercalados),
+        # agrupados por grosor de línea: (grosor, primer vértice, cantidad)
+        self._lines_vbo = None
+        self._line_batches = ()
+        
+        # Programa de shaders de las piezas del robot (se crea en _setup_opengl)
+        self._mesh_program = None
+        self._color_location = -1
+        self._model_view_location = -1
+        
+        # Cilindro unitario en GPU (se crea en _setup_opengl)
+        self._cylinder_vbo = None
+        self._cylinder_ebo = None
+        self._cylinder_vao = None
+        self._cylinder_index_count = 0
+        
+        # Grupos de cilindros iguales dibujados por instancias (pernos, cables):
+        # clave -> (vao, buffer de desplazamientos, cantidad de instancias)
+        self._cylinder_instances = {}
+        
+        # Cilindros del efector unidos en una malla por estado (activo/inactivo):
+        # activo -> (vbo, ebo, vao, cantidad de índices, esferas en coordenadas del efector)
+        self._effector_meshes = {}
+        
+        # Programa y cuadrado de las esferas impostoras (se crean en _setup_opengl)
+        self._sphere_program = None
+        self._sphere_locations = {}
+        self._sphere_vbo = None
+        self._sphere_vao = None
+        
+        # Esferas pendientes del frame: (centro en coordenadas de cámara, radio, color)
+        self._sphere_queue = []
+        
     def start(self):
         """Inicia el visualizador 3D en un hilo separado."""
         if not self.running:
@@ -91,12 +718,16 @@ class Robot3DViewer:
             print("Advertencia: No se puede mover el robot en el visualizador 3D - los motores no están activados")
             return
             
-        self.target_position = [x, y, z]
+        self.target_position[:] = (x, y, z)
         if animate:
+            # Limpiar antes de reiniciar el progreso para no perder la señal de fin
+            self._anim_done.clear()
             self.animation_progress = 0.0
         else:
-            self.robot_position = [x, y, z]
+            self.robot_position[:] = self.target_position
             self.animation_progress = 1.0
+            self._anim_done.set()
+        self._dirty = True
             
     def set_robot_state(self, motors_enabled=None, effector_active=None):
         """
@@ -110,6 +741,7 @@ class Robot3DViewer:
             self.motors_enabled = motors_enabled
         if effector_active is not None:
             self.effector_active = effector_active
+        self._dirty = True
             
     def home_robot(self):
         """Mueve el robot a la posición home."""
@@ -135,19 +767,104 @@ class Robot3DViewer:
         self.is_executing_gcode = True
         self.coordinate_mode = 'absolute'  # Reset a modo absoluto
         
+        # Interpretar todo el programa antes de iniciar la ejecución
+        targets, steps = self._parse_program(self.gcode_queue)
+        
         # Iniciar ejecución en hilo separado
-        threading.Thread(target=self._execute_gcode_sequence, daemon=True).start()
+        threading.Thread(target=self._execute_gcode_sequence, args=(targets, steps), daemon=True).start()
+    
+    def _parse_program(self, commands):
+        """
+        Interpreta la secuencia completa de G-code de una sola vez, resolviendo
+        los modos G90/G91 y el home en posiciones absolutas.
+        
+        Args:
+            commands (list): Lista de comandos G-code como strings
+            
+        Returns:
+            tuple: (array float32 (N, 3) con la posición tras cada comando,
+                    lista de N tuplas (comando, hay movimiento, efector, modo, mensaje);
+                    efector es True/False para M3/M5 y modo 'absolute'/'relative'
+                    para G90/G91, None en el resto)
+        """
+        targets = np.empty((len(commands), 3), dtype=np.float32)
+        steps = []
+        position = self.current_position.tolist()
+        mode = 'absolute'  # Cada programa comienza en modo absoluto
+        
+        for i, command in enumerate(commands):
+            moves, effector, new_mode, message = False, None, None, None
+            
+            # Ignorar comentarios y líneas vacías
+            line = command.strip()
+            parts = line.upper().split(None, 1) if not line.startswith(';') else []
+            if parts:
+                main_command = parts[0]
+                
+                # Extraer parámetros (los tokens que no son letra + número se ignoran)
+                params = {}
+                if len(parts) > 1:
+                    params = {letter: float(value) for letter, value in _GCODE_PARAM.findall(parts[1])}
+                
+                if main_command == 'G90':
+                    mode = new_mode = 'absolute'
+                    message = "  -> Modo absoluto activado"
+                    
+                elif main_command == 'G91':
+                    mode = new_mode = 'relative'
+                    message = "  -> Modo relativo activado"
+                    
+                elif main_command in ['G0', 'G1']:  # Movimientos
+                    axes = (params.get('X'), params.get('Y'), params.get('Z'))
+                    if mode == 'absolute':
+                        # Modo absoluto: usar coordenadas directamente
+                        position = [p if v is None else v for p, v in zip(position, axes)]
+                    else:
+                        # Modo relativo: sumar a posición actual
+                        position = [p if v is None else p + v for p, v in zip(position, axes)]
+                    moves = True
+                    message = f"  -> Movimiento a ({position[0]:.1f}, {position[1]:.1f}, {position[2]:.1f})"
+                    
+                elif main_command == 'M3':
+                    effector = True
+                    message = "  -> Efector activado"
+                    
+                elif main_command == 'M5':
+                    effector = False
+                    message = "  -> Efector desactivado"
+                    
+                elif main_command == 'G24':  # Home (comando personalizado)
+                    position = self.home_position.tolist()
+                    moves = True
+                    message = "  -> Movimiento a posición home"
+                    
+                else:
+                    message = f"  -> Comando no reconocido: {main_command}"
+            
+            targets[i] = position
+            steps.append((command, moves, effector, new_mode, message))
+        
+        return targets, steps
     
-    def _execute_gcode_sequence(self):
-        """Ejecuta la secuencia de G-code comando por comando."""
-        print(f"Iniciando ejecución de G-code con {len(self.gcode_queue)} comandos")
+    def _execute_gcode_sequence(self, targets, steps):
+        """Recorre el programa ya interpretado, comando por comando."""
+        print(f"Iniciando ejecución de G-code con {len(steps)} comandos")
         
-        for i, command in enumerate(self.gcode_queue):
+        for i, (command, moves, effector, mode, message) in enumerate(steps):
             if not self.is_executing_gcode or not self.motors_enabled:
                 break
                 
-            print(f"Ejecutando comando {i+1}/{len(self.gcode_queue)}: {command}")
-            self._execute_gcode_command(command.strip())
+            print(f"Ejecutando comando {i+1}/{len(steps)}: {command}")
+            if moves:
+                self._move_to_position(*targets[i].tolist())
+            if effector is not None:
+                self.effector_active = effector
+                self._dirty = True
+            if mode is not None:
+                # El modo público cambia al ejecutarse G90/G91, no al interpretar
+                self.coordinate_mode = mode
+            if message:
+                print(message)
             
             # Pausa entre comandos
             time.sleep(self.gcode_execution_speed)
@@ -155,89 +872,6 @@ class Robot3DViewer:
         self.is_executing_gcode = False
         print("Ejecución de G-code completada")
     
-    def _execute_gcode_command(self, command):
-        """
-        Ejecuta un comando G-code individual.
-        
-        Args:
-            command (str): Comando G-code (ej: "G1 X100 Y50 Z100")
-        """
-        if not command or command.startswith(';'):
-            return  # Ignorar comentarios y líneas vacías
-            
-        # Parsear comando
-        parts = command.upper().split()
-        if not parts:
-            return
-            
-        main_command = parts[0]
-        
-        # Extraer parámetros
-        params = {}
-        for part in parts[1:]:
-            if len(part) >= 2:
-                letter = part[0]
-                try:
-                    value = float(part[1:])
-                    params[letter] = value
-                except ValueError:
-                    continue
-        
-        # Ejecutar según el tipo de comando
-        if main_command == 'G90':
-            self.coordinate_mode = 'absolute'
-            print("  -> Modo absoluto activado")
-            
-        elif main_command == 'G91':
-            self.coordinate_mode = 'relative'
-            print("  -> Modo relativo activado")
-            
-        elif main_command in ['G0', 'G1']:  # Movimientos
-            self._execute_movement(params)
-            
-        elif main_command == 'M3':
-            self.effector_active = True
-            print("  -> Efector activado")
-            
-        elif main_command == 'M5':
-            self.effector_active = False
-            print("  -> Efector desactivado")
-            
-        elif main_command == 'G24':  # Home (comando personalizado)
-            self._move_to_position(*self.home_position)
-            print("  -> Movimiento a posición home")
-            
-        else:
-            print(f"  -> Comando no reconocido: {main_command}")
-    
-    def _execute_movement(self, params):
-        """
-        Ejecuta un comando de movimiento G0/G1.
-        
-        Args:
-            params (dict): Diccionario con parámetros del comando (X, Y, Z, E)
-        """
-        # Obtener coordenadas del comando
-        x = params.get('X')
-        y = params.get('Y') 
-        z = params.get('Z')
-        speed = params.get('E', None)  # E se usa como velocidad en algunos sistemas
-        
-        if self.coordinate_mode == 'absolute':
-            # Modo absoluto: usar coordenadas directamente
-            new_x = x if x is not None else self.current_position[0]
-            new_y = y if y is not None else self.current_position[1]
-            new_z = z if z is not None else self.current_position[2]
-        else:
-            # Modo relativo: sumar a posición actual
-            new_x = self.current_position[0] + (x if x is not None else 0)
-            new_y = self.current_position[1] + (y if y is not None else 0)
-            new_z = self.current_position[2] + (z if z is not None else 0)
-        
-        # Ejecutar movimiento
-        self._move_to_position(new_x, new_y, new_z)
-        print(f"  -> Movimiento a ({new_x:.1f}, {new_y:.1f}, {new_z:.1f})")
-    
     def _move_to_position(self, x, y, z):
         """
         Mueve el robot a la posición especificada y actualiza la posición actual.
@@ -246,11 +880,10 @@ class Robot3DViewer:
             x, y, z (float): Coordenadas de destino
         """
         self.update_position(x, y, z, animate=True)
-        self.current_position = [x, y, z]
+        self.current_position[:] = (x, y, z)
         
-        # Esperar a que termine la animación
-        while self.animation_progress < 1.0:
-            time.sleep(0.1)
+        # Esperar a que el bucle de renderizado termine la animación
+        self._anim_done.wait()
     
     def stop_gcode_execution(self):
         """Detiene la ejecución de G-code."""
@@ -265,6 +898,10 @@ class Robot3DViewer:
         
         # Configuración inicial de OpenGL
         self._setup_opengl()
+        # Contexto nuevo (también al reabrir la ventana): dibujar el primer frame
+        # sin esperar un VIDEOEXPOSE, que no todas las plataformas envían
+        self._cam_dirty = True
+        self._dirty = True
         
         clock = pygame.time.Clock()
         
@@ -280,6 +917,10 @@ class Robot3DViewer:
                 if event.type == pygame.QUIT:
                     self.running = False
                     
+                elif event.type == pygame.VIDEOEXPOSE:
+                    # La ventana se volvió a mostrar: redibujar
+                    self._dirty = True
+                    
                 elif event.type == pygame.MOUSEBUTTONDOWN:
                     if event.button == 1:  # Botón izquierdo
                         mouse_down = True
@@ -300,6 +941,8 @@ class Robot3DViewer:
                     
                     # Limitar rotación vertical
                     self.camera_rotation[1] = max(-90, min(90, self.camera_rotation[1]))
+                    self._cam_dirty = True
+                    self._dirty = True
                     
                     last_mouse_pos = mouse_pos
                     
@@ -307,23 +950,31 @@ class Robot3DViewer:
                     # Zoom con rueda del mouse
                     self.camera_distance -= event.y * CAMERA_ZOOM_SENSITIVITY
                     self.camera_distance = max(CAMERA_MIN_DISTANCE, min(CAMERA_MAX_DISTANCE, self.camera_distance))
+                    self._cam_dirty = True
+                    self._dirty = True
             
             # Actualizar animación
             if self.animation_progress < 1.0:
                 self.animation_progress = min(1.0, self.animation_progress + dt * self.animation_speed)
                 
-                # Interpolación suave de la posición
-                for i in range(3):
-                    self.robot_position[i] = self._lerp(
-                        self.robot_position[i], 
-                        self.target_position[i], 
-                        self._smooth_step(self.animation_progress)
-                    )
+                # Interpolación suave de la posición (smooth step + lerp vectorizado)
+                t = self.animation_progress
+                t = t * t * (3.0 - 2.0 * t)
+                self.robot_position += (self.target_position - self.robot_position) * t
+                if self.animation_progress >= 1.0:
+                    self._anim_done.set()
+                self._dirty = True
             
-            # Renderizar escena
-            self._render_scene()
-            pygame.display.flip()
+            # Renderizar escena solo si algo cambió desde el último frame
+            if self._dirty:
+                # Limpiar antes de dibujar para no perder cambios de otros hilos
+                self._dirty = False
+                self._render_scene()
+                pygame.display.flip()
             
+        # Liberar a quien espere una animación que ya no se va a completar
+        self._anim_done.set()
+        self._release_opengl()
         pygame.quit()
         
     def _setup_opengl(self):
@@ -347,215 +998,160 @@ class Robot3DViewer:
         # Configuración de perspectiva - ajustada para robot grande
         glMatrixMode(GL_PROJECTION)
         glLoadIdentity()
-        gluPerspective(FIELD_OF_VIEW, (self.width / self.height), 1.0, 2000.0)  # Plano lejano aumentado
+        projection = _perspective(FIELD_OF_VIEW, (self.width / self.height), 1.0, 2000.0)  # Plano lejano aumentado
+        glLoadMatrixf(np.ascontiguousarray(projection.T, dtype=np.float32))
         
         # Volver a matriz de modelo/vista
         glMatrixMode(GL_MODELVIEW)
         
+        # Los buffers pertenecen al contexto recién creado
+        lines, self._line_batches = _build_line_batches()
+        self._lines_vbo = _upload_buffer(GL_ARRAY_BUFFER, lines)
+        
+        self._setup_mesh_program(projection)
+        
+        vertices, indices = _build_cylinder_mesh()
+        self._cylinder_vbo = _upload_buffer(GL_ARRAY_BUFFER, vertices)
+        self._cylinder_ebo = _upload_buffer(GL_ELEMENT_ARRAY_BUFFER, indices)
+        self._cylinder_vao = _create_mesh_vao(self._cylinder_vbo, self._cylinder_ebo)
+        self._cylinder_index_count = len(indices)
+        
+        self._cylinder_instances = {}
+        self._effector_meshes = {}
+        
+        self._sphere_vbo = _upload_buffer(GL_ARRAY_BUFFER, _SPHERE_QUAD)
+        self._sphere_vao = glGenVertexArrays(1)
+        glBindVertexArray(self._sphere_vao)
+        glBindBuffer(GL_ARRAY_BUFFER, self._sphere_vbo)
+        glEnableVertexAttribArray(0)
+        glVertexAttribPointer(0, 2, GL_FLOAT, GL_FALSE, 0, None)
+        glBindVertexArray(0)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        
+    def _release_opengl(self):
+        """Libera los buffers, VAOs y shaders creados en _setup_opengl (con el contexto aún activo)."""
+        vaos = [self._cylinder_vao, self._sphere_vao]
+        buffers = [self._lines_vbo, self._cylinder_vbo, self._cylinder_ebo, self._sphere_vbo]
+        for vao, offset_vbo, _ in self._cylinder_instances.values():
+            vaos.append(vao)
+            buffers.append(offset_vbo)
+        for vbo, ebo, vao, _, _ in self._effector_meshes.values():
+            vaos.append(vao)
+            buffers.extend((vbo, ebo))
+        
+        glDeleteVertexArrays(len(vaos), vaos)
+        glDeleteBuffers(len(buffers), buffers)
+        glDeleteProgram(self._mesh_program)
+        glDeleteProgram(self._sphere_program)
+        
+        self._lines_vbo = None
+        self._mesh_program = None
+        self._cylinder_vbo = self._cylinder_ebo = self._cylinder_vao = None
+        self._cylinder_instances = {}
+        self._effector_meshes = {}
+        self._sphere_program = None
+        self._sphere_vbo = self._sphere_vao = None
+        
+    def _setup_mesh_program(self, projection):
+        """Compila los programas de shaders de las piezas y de las esferas y fija la proyección y la iluminación."""
+        self._mesh_program = self._compile_lit_program(_MESH_VERTEX_SHADER, _MESH_FRAGMENT_SHADER, projection)
+        self._color_location = glGetUniformLocation(self._mesh_program, "u_color")
+        self._model_view_location = glGetUniformLocation(self._mesh_program, "u_model_view")
+        # Valores fijos de los atributos opcionales para las mallas que no los usan
+        # (estado global, no del VAO): sin desplazamiento y color por vértice neutro
+        glVertexAttrib3f(6, 0.0, 0.0, 0.0)
+        glVertexAttrib3f(7, 1.0, 1.0, 1.0)
+        
+        self._sphere_program = self._compile_lit_program(_SPHERE_VERTEX_SHADER, _SPHERE_FRAGMENT_SHADER, projection)
+        self._sphere_locations = {name: glGetUniformLocation(self._sphere_program, name)
+                                  for name in ("u_center", "u_radius", "u_color")}
+        
+    def _compile_lit_program(self, vertex_source, fragment_source, projection):
+        """Compila un programa de shaders y le carga la proyección y los parámetros de la luz."""
+        program = compileProgram(
+            compileShader(vertex_source, GL_VERTEX_SHADER),
+            compileShader(fragment_source, GL_FRAGMENT_SHADER),
+        )
+        glUseProgram(program)
+        glUniformMatrix4fv(glGetUniformLocation(program, "u_projection"), 1, GL_TRUE,
+                           projection.astype(np.float32))
+        # La luz se definió con la vista identidad: su posición está en coordenadas de cámara
+        glUniform3f(glGetUniformLocation(program, "u_light_position"), *LIGHT_POSITION[:3])
+        glUniform3f(glGetUniformLocation(program, "u_ambient"),
+                    *(g + a for g, a in zip(_GLOBAL_AMBIENT, LIGHT_AMBIENT[:3])))
+        glUniform3f(glGetUniformLocation(program, "u_diffuse"), *LIGHT_DIFFUSE[:3])
+        glUseProgram(0)
+        return program
+        
     def _render_scene(self):
         """Renderiza la escena 3D completa."""
         glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
         
-        # Configurar cámara
-        glLoadIdentity()
-        
-        # Posicionar cámara con rotación orbital centrada en el robot
-        cam_x = self.camera_distance * math.cos(math.radians(self.camera_rotation[1])) * math.sin(math.radians(self.camera_rotation[0]))
-        cam_y = self.camera_distance * math.sin(math.radians(self.camera_rotation[1])) + 60.0  # Elevar punto de vista para robot grande
-        cam_z = self.camera_distance * math.cos(math.radians(self.camera_rotation[1])) * math.cos(math.radians(self.camera_rotation[0]))
-        
-        # Centrar la cámara en el punto medio del robot (altura media ajustada)
-        center_height = self.base_height + (self.lower_arm_length + self.upper_arm_length) / 2
-        gluLookAt(cam_x, cam_y, cam_z,          # posición de la cámara
-                  0, center_height, 0,          # punto al que mira (centro del robot)
-                  0, 1, 0)                      # vector up
+        # La cámara solo se recalcula si el usuario la movió
+        if self._cam_dirty:
+            self._update_camera()
+        self._apply_view()
         
         # Renderizar elementos de la escena
-        self._render_ground()
-        self._render_coordinate_axes()
+        self._render_ground_and_axes()
         self._render_robot()
         
-    def _render_ground(self):
-        """Renderiza el plano del suelo en XZ (Y=0)."""
-        glColor3f(*GRID_COLOR)
-        glBegin(GL_LINES)
-        
-        # Líneas de cuadrícula en el plano XZ (Y=0)
-        for i in range(-GRID_SIZE, GRID_SIZE + 1, GRID_SPACING):
-            # Líneas paralelas al eje X (en plano XZ)
-            glVertex3f(i, 0.0, -GRID_SIZE)
-            glVertex3f(i, 0.0, GRID_SIZE)
-            # Líneas paralelas al eje Z (en plano XZ)
-            glVertex3f(-GRID_SIZE, 0.0, i)
-            glVertex3f(GRID_SIZE, 0.0, i)
-            
-        glEnd()
-        
-        # Líneas principales más gruesas
-        glLineWidth(2.0)
-        glColor3f(*GRID_MAIN_COLOR)
-        glBegin(GL_LINES)
-        # Línea central X (en Y=0)
-        glVertex3f(-GRID_SIZE, 0.0, 0)
-        glVertex3f(GRID_SIZE, 0.0, 0)
-        # Línea central Z (en Y=0)
-        glVertex3f(0, 0.0, -GRID_SIZE)
-        glVertex3f(0, 0.0, GRID_SIZE)
-        glEnd()
-        glLineWidth(1.0)
-        
-    def _render_coordinate_axes(self):
-        """Renderiza los ejes de coordenadas con valores de referencia mejorados."""
-        # Ejes principales más largos
-        glLineWidth(3.0)
-        glBegin(GL_LINES)
-        
-        # Eje X (rojo) - Horizontal derecha
-        glColor3f(*AXIS_X_COLOR)
-        glVertex3f(0, 0, 0)
-        glVertex3f(AXIS_LENGTH, 0, 0)
-        
-        # Eje Y (verde) - Vertical arriba (era Z antes)
-        glColor3f(*AXIS_Y_COLOR)
-        glVertex3f(0, 0, 0)
-        glVertex3f(0, AXIS_LENGTH, 0)
-        
-        # Eje Z (azul) - Horizontal adelante/atrás
-        glColor3f(*AXIS_Z_COLOR)
-        glVertex3f(0, 0, 0)
-        glVertex3f(0, 0, AXIS_LENGTH)
-        glEnd()
-        
-        # Marcas de graduación más densas y visibles
-        glLineWidth(2.0)
-        glBegin(GL_LINES)
-        
-        # Marcas en eje X (cada AXIS_MARKS_INTERVAL unidades)
-        glColor3f(AXIS_X_COLOR[0] * 0.8, AXIS_X_COLOR[1] * 0.8, AXIS_X_COLOR[2] * 0.8)
-        for i in range(AXIS_MARKS_INTERVAL, AXIS_LENGTH + 1, AXIS_MARKS_INTERVAL):
-            # Marcas principales (más largas)
-            mark_size = AXIS_MARKS_SIZE * 1.5 if i % AXIS_NUMBERS_INTERVAL == 0 else AXIS_MARKS_SIZE
-            glVertex3f(i, -mark_size, 0)
-            glVertex3f(i, mark_size, 0)
-            glVertex3f(i, 0, -mark_size)
-            glVertex3f(i, 0, mark_size)
-        
-        # Marcas en eje Y (cada AXIS_MARKS_INTERVAL unidades) - Ahora vertical
-        glColor3f(AXIS_Y_COLOR[0] * 0.8, AXIS_Y_COLOR[1] * 0.8, AXIS_Y_COLOR[2] * 0.8)
-        for i in range(AXIS_MARKS_INTERVAL, AXIS_LENGTH + 1, AXIS_MARKS_INTERVAL):
-            mark_size = AXIS_MARKS_SIZE * 1.5 if i % AXIS_NUMBERS_INTERVAL == 0 else AXIS_MARKS_SIZE
-            glVertex3f(-mark_size, i, 0)
-            glVertex3f(mark_size, i, 0)
-            glVertex3f(0, i, -mark_size)
-            glVertex3f(0, i, mark_size)
-        
-        # Marcas en eje Z (cada AXIS_MARKS_INTERVAL unidades) - Ahora profundidad
-        glColor3f(AXIS_Z_COLOR[0] * 0.8, AXIS_Z_COLOR[1] * 0.8, AXIS_Z_COLOR[2] * 0.8)
-        for i in range(AXIS_MARKS_INTERVAL, AXIS_LENGTH + 1, AXIS_MARKS_INTERVAL):
-            mark_size = AXIS_MARKS_SIZE * 1.5 if i % AXIS_NUMBERS_INTERVAL == 0 else AXIS_MARKS_SIZE
-            glVertex3f(-mark_size, 0, i)
-            glVertex3f(mark_size, 0, i)
-            glVertex3f(0, -mark_size, i)
-            glVertex3f(0, mark_size, i)
-        
-        glEnd()
-        
-        # Renderizar etiquetas de valores principales
-        self._render_axis_labels()
-        glLineWidth(1.0)
-    
-    def _render_axis_labels(self):
-        """Renderiza etiquetas numéricas en los ejes principales."""
-        # Marcadores numéricos más visibles en posiciones clave
-        label_size = 0.6
-        
-        # Etiquetas en eje X (rojo)
-        glColor3f(*AXIS_X_COLOR)
-        for i in range(AXIS_NUMBERS_INTERVAL, AXIS_LENGTH + 1, AXIS_NUMBERS_INTERVAL):
-            self._render_number_display(i, -1.0, -1.0, str(i), label_size)
-        
-        # Etiquetas en eje Y (verde) - Ahora vertical
-        glColor3f(*AXIS_Y_COLOR)
-        for i in range(AXIS_NUMBERS_INTERVAL, AXIS_LENGTH + 1, AXIS_NUMBERS_INTERVAL):
-            self._render_number_display(-1.0, i, -1.0, str(i), label_size)
+    def _update_camera(self):
+        """Recalcula la posición de la cámara y la matriz de vista."""
+        # Posicionar cámara con rotación orbital centrada en el robot
+        yaw = self.camera_rotation[0] * _DEG2RAD
+        pitch = self.camera_rotation[1] * _DEG2RAD
+        cos_pitch = math.cos(pitch)
+        cam_x = self.camera_distance * cos_pitch * math.sin(yaw)
+        cam_y = self.camera_distance * math.sin(pitch) + 60.0  # Elevar punto de vista para robot grande
+        cam_z = self.camera_distance * cos_pitch * math.cos(yaw)
+        self._camera_position = (cam_x, cam_y, cam_z)
         
-        # Etiquetas en eje Z (azul) - Ahora profundidad
-        glColor3f(*AXIS_Z_COLOR)
-        for i in range(AXIS_NUMBERS_INTERVAL, AXIS_LENGTH + 1, AXIS_NUMBERS_INTERVAL):
-            self._render_number_display(-1.0, -1.0, i, str(i), label_size)
-    
-    def _render_number_display(self, x, y, z, number, size):
-        """Renderiza números usando geometría simple pero más legible."""
-        glPushMatrix()
-        glTranslatef(x, y, z)
-        glScalef(size, size, size)
-        
-        glLineWidth(3.0)
-        glBegin(GL_LINES)
-        
-        # Renderizar dígitos usando líneas más elaboradas
-        for i, digit in enumerate(number):
-            offset_x = i * 1.2  # Espaciado entre dígitos
-            self._render_digit(digit, offset_x, 0, 0)
-        
-        glEnd()
-        glLineWidth(1.0)
-        glPopMatrix()
-    
-    def _render_digit(self, digit, offset_x, offset_y, offset_z):
-        """Renderiza un dígito específico usando líneas."""
-        # Coordenadas base para formar los números
-        def line(x1, y1, x2, y2):
-            glVertex3f(offset_x + x1, offset_y + y1, offset_z)
-            glVertex3f(offset_x + x2, offset_y + y2, offset_z)
-        
-        if digit == '0':
-            line(0, 0, 1, 0)    # base
-            line(0, 1, 1, 1)    # top
-            line(0, 0, 0, 1)    # left
-            line(1, 0, 1, 1)    # right
-        elif digit == '1':
-            line(0.5, 0, 0.5, 1)  # vertical
-            line(0.3, 0.8, 0.5, 1) # top angle
-        elif digit == '2':
-            line(0, 1, 1, 1)    # top
-            line(1, 1, 1, 0.5)  # right top
-            line(1, 0.5, 0, 0.5) # middle
-            line(0, 0.5, 0, 0)  # left bottom
-            line(0, 0, 1, 0)    # bottom
-        elif digit == '3':
-            line(0, 1, 1, 1)    # top
-            line(1, 1, 1, 0)    # right
-            line(0, 0.5, 1, 0.5) # middle
-            line(0, 0, 1, 0)    # bottom
-        elif digit == '4':
-            line(0, 1, 0, 0.5)  # left top
-            line(0, 0.5, 1, 0.5) # middle
-            line(1, 1, 1, 0)    # right
-        elif digit == '5':
-            line(0, 1, 1, 1)    # top
-            line(0, 1, 0, 0.5)  # left top
-            line(0, 0.5, 1, 0.5) # middle
-            line(1, 0.5, 1, 0)  # right bottom
-            line(1, 0, 0, 0)    # bottom
+        # Centrar la cámara en el punto medio del robot (altura media ajustada)
+        center_height = self.base_height + (self.lower_arm_length + self.upper_arm_length) / 2
+        view = _look_at(self._camera_position,  # posición de la cámara
+                        (0, center_height, 0),  # punto al que mira (centro del robot)
+                        (0, 1, 0))              # vector up
+        # OpenGL espera la matriz en orden de columnas
+        self._view = np.ascontiguousarray(view.T, dtype=np.float32)
+        self._cam_dirty = False
+        
+    def _apply_view(self):
+        """Carga en GL_MODELVIEW la matriz de vista calculada para el frame actual."""
+        glLoadMatrixf(self._view)
+        
+    def _render_ground_and_axes(self):
+        """Renderiza la cuadrícula del suelo (plano XZ, Y=0) y los ejes con sus referencias."""
+        glBindBuffer(GL_ARRAY_BUFFER, self._lines_vbo)
+        glInterleavedArrays(GL_C3F_V3F, 0, None)
+        
+        # Un solo cambio de grosor por lote (ordenados de más fino a más grueso)
+        for width, first, count in self._line_batches:
+            glLineWidth(width)
+            glDrawArrays(GL_LINES, first, count)
+        
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
         
     def _render_robot(self):
         """Renderiza el brazo robótico con geometría realista."""
         # Aplicar rotación global para orientar el robot correctamente
         # Rotar -90° en X para que la base apoye en el suelo (plano XZ)
-        glPushMatrix()
-        glRotatef(-90, 1, 0, 0)  # Rotar todo el robot -90° en X
+        self._model_stack = [_ROBOT_ORIENTATION @ self._view]
         
         # Calcular ángulos del brazo basados en la posición
         angles = self._calculate_arm_angles(self.robot_position)
         
+        glUseProgram(self._mesh_program)
+        
         # 1. BASE DEL ROBOT - Más robusta y realista
         self._render_robot_base()
         
         # 2. ARTICULACIÓN DE LA BASE (motor de rotación)
-        glPushMatrix()
-        glTranslatef(0.0, 0.0, self.base_height)
-        glRotatef(angles['rotation'], 0, 0, 1)  # Rotación en Z para base
+        self._push_matrix()
+        self._translate(0.0, 0.0, self.base_height)
+        self._rotate(angles['rotation'], 0, 0, 1)  # Rotación en Z para base
         
         # Motor de la base
         base_motor_color = MOTORS_ON_LOWER_ARM if self.motors_enabled else MOTORS_OFF_LOWER_ARM
@@ -564,8 +1160,8 @@ class Robot3DViewer:
         self._render_cylinder(0.0, 0.0, 0.0, base_motor_radius, base_motor_height, base_motor_color)
         
         # 3. BRAZO INFERIOR (lower arm) - Más detallado
-        glTranslatef(0.0, 0.0, 0.6)
-        glRotatef(angles['lower_arm'], 1, 0, 0)  # Ángulo brazo inferior
+        self._translate(0.0, 0.0, 0.6)
+        self._rotate(angles['lower_arm'], 1, 0, 0)  # Ángulo brazo inferior
         
         # Articulación del brazo inferior
         joint_color = (0.5, 0.5, 0.5)
@@ -573,41 +1169,44 @@ class Robot3DViewer:
         self._render_cylinder(0.0, 0.0, 0.0, joint_radius, 3.0, joint_color)
         
         # Brazo inferior principal
-        glTranslatef(0.0, 0.0, 0.3)
+        self._translate(0.0, 0.0, 0.3)
         lower_arm_color = MOTORS_ON_LOWER_ARM if self.motors_enabled else MOTORS_OFF_LOWER_ARM
         lower_arm_radius = 3.5 * ARM_THICKNESS_FACTOR  # Usar factor de configuración
         self._render_arm_segment(self.lower_arm_length - 0.3, lower_arm_radius, lower_arm_color)
         
         # 4. ARTICULACIÓN INTERMEDIA (codo)
-        glTranslatef(0.0, 0.0, self.lower_arm_length - 0.3)
+        self._translate(0.0, 0.0, self.lower_arm_length - 0.3)
         elbow_radius = 5.0 * JOINT_SIZE_FACTOR
         elbow_height = 4.0 * JOINT_SIZE_FACTOR
         self._render_joint(elbow_radius, elbow_height, joint_color)
         
         # 5. BRAZO SUPERIOR (upper arm)
-        glRotatef(angles['upper_arm'], 1, 0, 0)  # Ángulo brazo superior
-        glTranslatef(0.0, 0.0, 0.4)
+        self._rotate(angles['upper_arm'], 1, 0, 0)  # Ángulo brazo superior
+        self._translate(0.0, 0.0, 0.4)
         
         upper_arm_color = MOTORS_ON_UPPER_ARM if self.motors_enabled else MOTORS_OFF_UPPER_ARM
         upper_arm_radius = 3.0 * ARM_THICKNESS_FACTOR  # Usar factor de configuración
         self._render_arm_segment(self.upper_arm_length - 0.4, upper_arm_radius, upper_arm_color)
         
         # 6. ARTICULACIÓN DE MUÑECA
-        glTranslatef(0.0, 0.0, self.upper_arm_length - 0.4)
+        self._translate(0.0, 0.0, self.upper_arm_length - 0.4)
         wrist_radius = 4.0 * JOINT_SIZE_FACTOR
         wrist_height = 3.0 * JOINT_SIZE_FACTOR
         self._render_joint(wrist_radius, wrist_height, joint_color)
         
         # 7. EFECTOR FINAL - Más detallado
-        glTranslatef(0.0, 0.0, 0.3)
+        self._translate(0.0, 0.0, 0.3)
         self._render_advanced_effector(self.effector_active)
         
         # 8. Indicador de posición objetivo
         if self.animation_progress < 1.0:
             self._render_target_position()
         
-        glPopMatrix()  # Fin de transformaciones del brazo
-        glPopMatrix()  # Fin de rotación global del robot
+        self._pop_matrix()  # Fin de transformaciones del brazo
+        
+        # Las esferas se dibujan juntas al final para cambiar de programa una sola vez
+        self._render_spheres()
+        glUseProgram(0)
         
     def _render_robot_base(self):
         """Renderiza una base robusta y realista para el robot."""
@@ -630,14 +1229,9 @@ class Robot3DViewer:
         
         # Detalles de la base (pernos decorativos en círculo)
         bolt_color = (0.45, 0.45, 0.45)
-        bolt_positions = 8  # 8 pernos alrededor
-        bolt_radius = 1.2 * JOINT_SIZE_FACTOR  # Pernos escalados
-        bolt_height = 3.0 * JOINT_SIZE_FACTOR  # Altura escalada
-        for i in range(bolt_positions):
-            angle = (2 * math.pi * i) / bolt_positions
-            x = (platform_radius * 0.7) * math.cos(angle)
-            y = (platform_radius * 0.7) * math.sin(angle)
-            self._render_cylinder(x, y, 0.5, bolt_radius, bolt_height, bolt_color)
+        bolts = self._get_cylinder_instances('base_bolts', lambda: [
+            (x / self._bolt_radius, y / self._bolt_radius, 0.0) for x, y in self._bolt_xy])
+        self._render_cylinder_instances(bolts, 0.0, 0.0, 0.5, self._bolt_radius, self._bolt_height, bolt_color)
         
         # Placa superior de montaje
         mount_color = (0.4, 0.4, 0.4)
@@ -651,6 +1245,7 @@ class Robot3DViewer:
         # Parámetros de diseño industrial
         segment_sections = 4  # Dividir el brazo en secciones
         section_length = length / segment_sections
+        alternate_color, ring_color = _ARM_SHADES.get(color) or _arm_shades(color)
         
         for i in range(segment_sections):
             z_offset = i * section_length
@@ -659,16 +1254,13 @@ class Robot3DViewer:
             radius_factor = 1.0 - (i * 0.1)  # Gradualmente más delgado
             current_radius = base_radius * radius_factor
             
-            # Sección principal
-            section_color = color
-            if i % 2 == 1:  # Alternar colores para detalle visual
-                section_color = (color[0] * 0.9, color[1] * 0.9, color[2] * 0.9)
+            # Sección principal (alternar colores para detalle visual)
+            section_color = alternate_color if i % 2 == 1 else color
             
             self._render_cylinder(0.0, 0.0, z_offset, current_radius, section_length * 0.8, section_color)
             
             # Uniones entre secciones (anillos)
             if i < segment_sections - 1:
-                ring_color = (color[0] * 0.7, color[1] * 0.7, color[2] * 0.7)
                 ring_z = z_offset + section_length * 0.8
                 self._render_cylinder(0.0, 0.0, ring_z, current_radius * 1.15, section_length * 0.2, ring_color)
         
@@ -678,199 +1270,215 @@ class Robot3DViewer:
     def _render_cable_protection(self, length, radius, color):
         """Renderiza protección de cables a lo largo del brazo."""
         # Simular mangueras/cables que corren por el brazo
-        cable_count = 3
-        for i in range(cable_count):
-            angle = (2 * math.pi * i) / cable_count
-            offset_x = radius * 2 * math.cos(angle) 
-            offset_y = radius * 2 * math.sin(angle)
-            
-            # Cable/manguera
-            self._render_cylinder(offset_x, offset_y, 0.1, radius, length * 0.9, color)
+        # (separados 2 radios del eje: desplazamiento fijo en el espacio del cable)
+        cables = self._get_cylinder_instances('cables', lambda: [
+            (2.0 * cos_a, 2.0 * sin_a, 0.0) for cos_a, sin_a in _CABLE_OFFSETS])
+        self._render_cylinder_instances(cables, 0.0, 0.0, 0.1, radius, length * 0.9, color)
     
     def _render_joint(self, radius, height, color):
-        """Renderiza una articulación industrial realista."""
+        """Renderiza una articulación industrial realista (con menos detalle si la cámara está lejos)."""
         # Cuerpo principal de la articulación
         self._render_cylinder(0.0, 0.0, 0.0, radius, height * 0.6, color)
+        if self.camera_distance > LOD_FAR_DISTANCE:
+            return
         
         # Placa superior e inferior
         plate_color = (color[0] * 1.3, color[1] * 1.3, color[2] * 1.3)
         self._render_cylinder(0.0, 0.0, 0.0, radius * 1.2, height * 0.1, plate_color)
         self._render_cylinder(0.0, 0.0, height * 0.9, radius * 1.2, height * 0.1, plate_color)
+        if self.camera_distance > LOD_MED_DISTANCE:
+            return
         
         # Detalles de pernos en la articulación
+        # (un anillo inferior y otro superior, 8 alturas de perno más arriba)
         bolt_color = (0.3, 0.3, 0.3)
-        bolt_count = 6
-        for i in range(bolt_count):
-            angle = (2 * math.pi * i) / bolt_count
-            x = radius * 0.9 * math.cos(angle)
-            y = radius * 0.9 * math.sin(angle)
-            self._render_cylinder(x, y, height * 0.05, 0.05, height * 0.1, bolt_color)
-            self._render_cylinder(x, y, height * 0.85, 0.05, height * 0.1, bolt_color)
+        bolt_radius = 0.05
+        spread = radius * 0.9 / bolt_radius
+        bolts = self._get_cylinder_instances(('joint_bolts', radius), lambda: [
+            (spread * cos_a, spread * sin_a, z)
+            for z in (0.0, 8.0) for cos_a, sin_a in _JOINT_BOLT_DIRECTIONS])
+        self._render_cylinder_instances(bolts, 0.0, 0.0, height * 0.05, bolt_radius, height * 0.1, bolt_color)
         
         # Indicador de movimiento (marca de referencia)
-        glPushMatrix()
-        glTranslatef(radius * 0.7, 0, height * 0.5)
-        glColor3f(1.0, 1.0, 0.0)  # Amarillo para visibilidad
-        self._render_sphere(0.08, 6, 6)
-        glPopMatrix()
+        self._push_matrix()
+        self._translate(radius * 0.7, 0, height * 0.5)
+        self._render_sphere(0.08, (1.0, 1.0, 0.0))  # Amarillo para visibilidad
+        self._pop_matrix()
     
     def _render_advanced_effector(self, active):
-        """Renderiza un efector final industrial detallado."""
+        """Renderiza el efector final: todos sus cilindros con una sola llamada y luego sus esferas."""
+        vao, index_count, spheres = self._get_effector_mesh(active)[2:]
+        glUniform3f(self._color_location, 1.0, 1.0, 1.0)
+        glUniformMatrix4fv(self._model_view_location, 1, GL_FALSE, self._model_stack[-1])
+        glBindVertexArray(vao)
+        glDrawElements(GL_TRIANGLES, index_count, GL_UNSIGNED_SHORT, None)
+        glBindVertexArray(0)
+        
+        for x, y, z, radius, color in spheres:
+            self._push_matrix()
+            self._translate(x, y, z)
+            self._render_sphere(radius, color)
+            self._pop_matrix()
+        
+    def _get_effector_mesh(self, active):
+        """Devuelve (vbo, ebo, vao, cantidad de índices, esferas) del efector, subiéndolo a la GPU si hace falta."""
+        mesh = self._effector_meshes.get(active)
+        if mesh is None:
+            cylinders, spheres = self._build_effector_parts(active)
+            vertices, indices = _bake_cylinders(cylinders)
+            vbo = _upload_buffer(GL_ARRAY_BUFFER, vertices)
+            ebo = _upload_buffer(GL_ELEMENT_ARRAY_BUFFER, indices)
+            mesh = (vbo, ebo, _create_mesh_vao(vbo, ebo, colored=True), len(indices), spheres)
+            self._effector_meshes[active] = mesh
+        return mesh
+        
+    def _build_effector_parts(self, active):
+        """
+        Describe un efector final industrial detallado en sus propias coordenadas.
+        
+        Returns:
+            tuple: (cilindros [(matriz colocada, color)], esferas [(x, y, z, radio, color)])
+        """
         body_color = EFFECTOR_ACTIVE_BODY if active else EFFECTOR_INACTIVE_BODY
         tip_color = EFFECTOR_ACTIVE_TIP if active else EFFECTOR_INACTIVE_TIP
+        cylinders = []
+        spheres = []
+        
+        def cylinder(matrix, x, y, z, radius, height, color):
+            cylinders.append((_mat_place(matrix, x, y, z, radius, radius, height), color))
+            
+        def sphere(matrix, radius, color):
+            spheres.append((float(matrix[3, 0]), float(matrix[3, 1]), float(matrix[3, 2]), radius, color))
         
         # Cuerpo base del efector (conector) - más grande
+        base = np.identity(4, dtype=np.float32)
         effector_base_radius = 3.0 * ARM_THICKNESS_FACTOR
-        self._render_cylinder(0.0, 0.0, 0.0, effector_base_radius, self.effector_length * 0.4, body_color)
+        cylinder(base, 0.0, 0.0, 0.0, effector_base_radius, self.effector_length * 0.4, body_color)
         
         # Cabeza principal del efector
-        glPushMatrix()
-        glTranslatef(0.0, 0.0, self.effector_length * 0.4)
+        head = base.copy()
+        _mat_translate(head, 0.0, 0.0, self.effector_length * 0.4)
         
         # Cuerpo principal - más grande
         effector_body_radius = 3.5 * ARM_THICKNESS_FACTOR
-        self._render_cylinder(0.0, 0.0, 0.0, effector_body_radius, self.effector_length * 0.4, body_color)
+        cylinder(head, 0.0, 0.0, 0.0, effector_body_radius, self.effector_length * 0.4, body_color)
         
         # Plataforma de herramienta - más grande
         platform_color = (body_color[0] * 1.2, body_color[1] * 1.2, body_color[2] * 1.2)
         platform_radius = 4.0 * ARM_THICKNESS_FACTOR
-        self._render_cylinder(0.0, 0.0, self.effector_length * 0.35, platform_radius, self.effector_length * 0.1, platform_color)
+        cylinder(head, 0.0, 0.0, self.effector_length * 0.35, platform_radius, self.effector_length * 0.1, platform_color)
         
         # Indicador de estado central - más grande
-        glTranslatef(0.0, 0.0, self.effector_length * 0.45)
-        glColor3f(*tip_color)
+        _mat_translate(head, 0.0, 0.0, self.effector_length * 0.45)
         indicator_radius = 1.5 * ARM_THICKNESS_FACTOR
-        self._render_sphere(indicator_radius, SPHERE_SLICES, SPHERE_STACKS)
+        sphere(head, indicator_radius, tip_color)
         
-        # Sistema de garra/herramienta
         if active:
-            self._render_tool_system()
-        else:
-            self._render_inactive_tool()
+            # Herramienta activa: pinzas abiertas
+            claw_color = (0.9, 0.7, 0.0)  # Dorado
+            claw_length = 0.8
+            claw_width = 0.08
             
-        glPopMatrix()
-    
-    def _render_tool_system(self):
-        """Renderiza un sistema de herramientas activo (pinzas, garra, etc.)."""
-        # Herramienta activa: pinzas abiertas
-        claw_color = (0.9, 0.7, 0.0)  # Dorado
-        claw_length = 0.8
-        claw_width = 0.08
-        
-        # Pinza izquierda
-        glPushMatrix()
-        glRotatef(-15, 1, 0, 0)  # Abertura de pinza
-        glTranslatef(-0.2, 0.0, 0.0)
-        self._render_cylinder(0.0, 0.0, 0.0, claw_width, claw_length, claw_color)
-        # Punta de la pinza
-        glTranslatef(0.0, 0.0, claw_length)
-        self._render_sphere(claw_width * 1.5, 6, 6)
-        glPopMatrix()
-        
-        # Pinza derecha
-        glPushMatrix()
-        glRotatef(15, 1, 0, 0)  # Abertura de pinza
-        glTranslatef(0.2, 0.0, 0.0)
-        self._render_cylinder(0.0, 0.0, 0.0, claw_width, claw_length, claw_color)
-        # Punta de la pinza
-        glTranslatef(0.0, 0.0, claw_length)
-        self._render_sphere(claw_width * 1.5, 6, 6)
-        glPopMatrix()
-        
-        # Actuador central
-        actuator_color = (0.6, 0.6, 0.6)
-        self._render_cylinder(0.0, 0.0, 0.1, 0.12, 0.3, actuator_color)
-    
-    def _render_inactive_tool(self):
-        """Renderiza herramienta inactiva (cerrada/retraída)."""
-        # Herramienta cerrada/retraída
-        inactive_color = (0.5, 0.5, 0.5)
-        self._render_cylinder(0.0, 0.0, 0.0, 0.15, 0.4, inactive_color)
+            # Pinzas izquierda y derecha (abertura de ±15°)
+            for angle, side in ((-15, -0.2), (15, 0.2)):
+                claw = head.copy()
+                _mat_rotate(claw, angle, 1, 0, 0)
+                _mat_translate(claw, side, 0.0, 0.0)
+                cylinder(claw, 0.0, 0.0, 0.0, claw_width, claw_length, claw_color)
+                # Punta de la pinza
+                _mat_translate(claw, 0.0, 0.0, claw_length)
+                sphere(claw, claw_width * 1.5, claw_color)
+            
+            # Actuador central
+            actuator_color = (0.6, 0.6, 0.6)
+            cylinder(head, 0.0, 0.0, 0.1, 0.12, 0.3, actuator_color)
+        else:
+            # Herramienta cerrada/retraída con su tapa protectora
+            inactive_color = (0.5, 0.5, 0.5)
+            cylinder(head, 0.0, 0.0, 0.0, 0.15, 0.4, inactive_color)
+            _mat_translate(head, 0.0, 0.0, 0.4)
+            sphere(head, 0.18, inactive_color)
         
-        # Tapa protectora
-        cap_color = (0.3, 0.3, 0.3)
-        glTranslatef(0.0, 0.0, 0.4)
-        self._render_sphere(0.18, 8, 8)
+        return cylinders, spheres
         
     def _render_cylinder(self, x, y, z, radius, height, color):
         """Renderiza un cilindro en la posición especificada."""
-        glColor3f(*color)
-        glPushMatrix()
-        glTranslatef(x, y, z)
-        
-        # Crear cilindro usando quads
-        segments = 16
-        glBegin(GL_QUAD_STRIP)
-        for i in range(segments + 1):
-            angle = 2.0 * math.pi * i / segments
-            x_pos = radius * math.cos(angle)
-            y_pos = radius * math.sin(angle)
-            
-            glVertex3f(x_pos, y_pos, 0)
-            glVertex3f(x_pos, y_pos, height)
-            
-        glEnd()
-        
-        # Tapas del cilindro
-        glBegin(GL_TRIANGLE_FAN)
-        glVertex3f(0, 0, 0)
-        for i in range(segments + 1):
-            angle = 2.0 * math.pi * i / segments
-            glVertex3f(radius * math.cos(angle), radius * math.sin(angle), 0)
-        glEnd()
-        
-        glBegin(GL_TRIANGLE_FAN)
-        glVertex3f(0, 0, height)
-        for i in range(segments + 1):
-            angle = 2.0 * math.pi * i / segments
-            glVertex3f(radius * math.cos(angle), radius * math.sin(angle), height)
-        glEnd()
-        
-        glPopMatrix()
-        
-    def _render_sphere(self, radius, slices, stacks):
-        """Renderiza una esfera."""
-        for i in range(stacks):
-            lat0 = math.pi * (-0.5 + float(i) / stacks)
-            z0 = radius * math.sin(lat0)
-            zr0 = radius * math.cos(lat0)
-            
-            lat1 = math.pi * (-0.5 + float(i + 1) / stacks)
-            z1 = radius * math.sin(lat1)
-            zr1 = radius * math.cos(lat1)
-            
-            glBegin(GL_QUAD_STRIP)
-            for j in range(slices + 1):
-                lng = 2 * math.pi * float(j) / slices
-                x = math.cos(lng)
-                y = math.sin(lng)
-                
-                glVertex3f(x * zr0, y * zr0, z0)
-                glVertex3f(x * zr1, y * zr1, z1)
-                
-            glEnd()
+        glUniform3f(self._color_location, *color)
+        glUniformMatrix4fv(self._model_view_location, 1, GL_FALSE,
+                           _mat_place(self._model_stack[-1], x, y, z, radius, radius, height))
+        
+        glBindVertexArray(self._cylinder_vao)
+        glDrawElements(GL_TRIANGLES, self._cylinder_index_count, GL_UNSIGNED_SHORT, None)
+        glBindVertexArray(0)
+        
+    def _get_cylinder_instances(self, key, make_offsets):
+        """
+        Devuelve (vao, cantidad) de un grupo de cilindros instanciados, creándolo la
+        primera vez con los desplazamientos de make_offsets() (en el espacio del
+        cilindro ya escalado).
+        """
+        instances = self._cylinder_instances.get(key)
+        if instances is None:
+            offsets = make_offsets()
+            vao = _create_mesh_vao(self._cylinder_vbo, self._cylinder_ebo)
+            instances = (vao, _add_instance_offsets(vao, offsets), len(offsets))
+            self._cylinder_instances[key] = instances
+        return instances[0], instances[2]
+        
+    def _render_cylinder_instances(self, instances, x, y, z, radius, height, color):
+        """Renderiza un grupo de cilindros iguales con una sola llamada instanciada."""
+        vao, count = instances
+        glUniform3f(self._color_location, *color)
+        glUniformMatrix4fv(self._model_view_location, 1, GL_FALSE,
+                           _mat_place(self._model_stack[-1], x, y, z, radius, radius, height))
+        glBindVertexArray(vao)
+        glDrawElementsInstanced(GL_TRIANGLES, self._cylinder_index_count, GL_UNSIGNED_SHORT, None, count)
+        glBindVertexArray(0)
+        
+    def _render_sphere(self, radius, color):
+        """Encola una esfera centrada en el origen de la matriz actual (se dibuja en _render_spheres)."""
+        # La pila solo acumula traslaciones y rotaciones: el radio no cambia en coordenadas de cámara
+        center = self._model_stack[-1][3]
+        self._sphere_queue.append((center[0], center[1], center[2], radius, color))
+        
+    def _render_spheres(self):
+        """Dibuja las esferas encoladas como impostores: un cuadrado de 4 vértices por esfera."""
+        locations = self._sphere_locations
+        glUseProgram(self._sphere_program)
+        glBindVertexArray(self._sphere_vao)
+        for x, y, z, radius, color in self._sphere_queue:
+            glUniform3f(locations["u_center"], x, y, z)
+            glUniform1f(locations["u_radius"], radius)
+            glUniform3f(locations["u_color"], *color)
+            glDrawArrays(GL_TRIANGLE_STRIP, 0, 4)
+        glBindVertexArray(0)
+        self._sphere_queue.clear()
             
     def _render_target_position(self):
         """Renderiza un indicador de la posición objetivo."""
-        glColor3f(0.0, 1.0, 1.0)  # Cian
-        glPushMatrix()
-        glLoadIdentity()
+        # Reutilizar la vista del frame: el objetivo está en coordenadas de mundo
+        self._model_stack.append(self._view.copy())
+        self._translate(*self.target_position)
+        self._render_sphere(TARGET_INDICATOR_SIZE, (0.0, 1.0, 1.0))  # Cian
+        self._pop_matrix()
         
-        # Posicionar cámara nuevamente para el indicador
-        cam_x = self.camera_distance * math.cos(math.radians(self.camera_rotation[1])) * math.sin(math.radians(self.camera_rotation[0]))
-        cam_y = self.camera_distance * math.sin(math.radians(self.camera_rotation[1])) + 60.0  # Ajustado para robot grande
-        cam_z = self.camera_distance * math.cos(math.radians(self.camera_rotation[1])) * math.cos(math.radians(self.camera_rotation[0]))
+    def _push_matrix(self):
+        """Equivalente a glPushMatrix sobre la pila de matrices del modelo."""
+        self._model_stack.append(self._model_stack[-1].copy())
         
-        # Centrar en el robot (altura media ajustada para nueva orientación)
-        center_height = self.base_height + (self.lower_arm_length + self.upper_arm_length) / 2
-        gluLookAt(cam_x, cam_y, cam_z, 0, center_height, 0, 0, 1, 0)
+    def _pop_matrix(self):
+        """Equivalente a glPopMatrix sobre la pila de matrices del modelo."""
+        self._model_stack.pop()
+        
+    def _translate(self, x, y, z):
+        """Equivalente a glTranslatef sobre la matriz actual del modelo."""
+        _mat_translate(self._model_stack[-1], x, y, z)
         
-        # La posición objetivo también necesita transformación para la nueva orientación
-        target_x, target_y, target_z = self.target_position
-        glTranslatef(target_x, target_y, target_z)
-        self._render_sphere(TARGET_INDICATOR_SIZE, SPHERE_SLICES, SPHERE_STACKS)  # Usar valores de configuración
-        glPopMatrix()
+    def _rotate(self, angle, x, y, z):
+        """Equivalente a glRotatef sobre la matriz actual del modelo."""
+        _mat_rotate(self._model_stack[-1], angle, x, y, z)
         
+
     def _calculate_arm_angles(self, position):
         """
         Calcula los ángulos del brazo para alcanzar la posición dada.
@@ -878,58 +1486,13 @@ class Robot3DViewer:
         Ahora: X=horizontal derecha, Y=vertical arriba, Z=profundidad
         """
         x, y, z = position
+        rotation_angle, lower_arm_angle, upper_arm_angle = _ik(
+            float(x), float(y), float(z),
+            self.lower_arm_length, self.upper_arm_length, self.base_height
+        )
         
-        # Ángulo de rotación de la base (rotación en plano XZ)
-        rotation_angle = math.degrees(math.atan2(x, z)) if z != 0 or x != 0 else 0
-        
-        # Distancia horizontal desde el centro (en plano XZ)
-        horizontal_dist = math.sqrt(x*x + z*z)
-        
-        # Altura desde la base (Y - base_height)
-        vertical_dist = y - self.base_height
-        if vertical_dist < 0:
-            vertical_dist = 0  # No permitir posiciones bajo la base
-        
-        # Distancia total al objetivo
-        target_dist = math.sqrt(horizontal_dist*horizontal_dist + vertical_dist*vertical_dist)
-        
-        # Verificar si la posición es alcanzable
-        max_reach = self.lower_arm_length + self.upper_arm_length
-        if target_dist > max_reach:
-            # Si no es alcanzable, escalar la posición
-            scale = max_reach / target_dist
-            horizontal_dist *= scale
-            vertical_dist *= scale
-            target_dist = max_reach
-            
-        # Ángulo del brazo inferior usando ley de cosenos
-        try:
-            cos_lower = (self.lower_arm_length*self.lower_arm_length + target_dist*target_dist - self.upper_arm_length*self.upper_arm_length) / (2 * self.lower_arm_length * target_dist)
-            cos_lower = max(-1, min(1, cos_lower))  # Clamp entre -1 y 1
-            
-            angle_to_target = math.degrees(math.atan2(vertical_dist, horizontal_dist))
-            lower_arm_angle = angle_to_target - math.degrees(math.acos(cos_lower))
-            
-            # Ángulo del brazo superior
-            cos_upper = (self.lower_arm_length*self.lower_arm_length + self.upper_arm_length*self.upper_arm_length - target_dist*target_dist) / (2 * self.lower_arm_length * self.upper_arm_length)
-            cos_upper = max(-1, min(1, cos_upper))
-            upper_arm_angle = 180 - math.degrees(math.acos(cos_upper))
-            
-        except (ValueError, ZeroDivisionError):
-            # En caso de error, usar ángulos por defecto
-            lower_arm_angle = 45
-            upper_arm_angle = 90
-            
         return {
             'rotation': rotation_angle,
             'lower_arm': lower_arm_angle,
             'upper_arm': upper_arm_angle
         }
-        
-    def _lerp(self, a, b, t):
-        """Interpolación lineal entre a y b."""
-        return a + (b - a) * t
-        
-    def _smooth_step(self, t):
-        """Función de suavizado para animaciones."""
-        return t * t * (3.0 - 2.0 * t)
\ No newline at end of file
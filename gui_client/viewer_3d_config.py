@@ -82,8 +82,10 @@ TARGET_INDICATOR_SIZE = 3.0                # Tamaño de la esfera aumentado
 # === CONFIGURACIÓN AVANZADA ===
 # Calidad de renderizado (más segments = mejor calidad, menor rendimiento)
 CYLINDER_SEGMENTS = 20       # Segmentos de los cilindros del brazo (mejor calidad)
-SPHERE_SLICES = 12           # Segmentos horizontales de las esferas
-SPHERE_STACKS = 12           # Segmentos verticales de las esferas
+
+# Nivel de detalle según la distancia de la cámara (los detalles chicos ocupan menos de un píxel)
+LOD_MED_DISTANCE = 800.0     # Más allá se omiten los pernos y marcas de las articulaciones
+LOD_FAR_DISTANCE = 1000.0    # Más allá las articulaciones se dibujan como un solo cilindro
 
 # Configuración de viewport - aumentada para mejor visualización
 WINDOW_WIDTH = 800         # Ancho por defecto de la ventana
@@ -102,12 +104,13 @@ CONSEJOS DE CONFIGURACIÓN:
    - Aumentar FPS_TARGET
 
 3. Para mejor calidad visual:
-   - Aumentar CYLINDER_SEGMENTS, SPHERE_SLICES, SPHERE_STACKS
+   - Aumentar CYLINDER_SEGMENTS (las esferas se calculan por píxel y no tienen segmentos)
    - Ajustar configuración de iluminación
 
 4. Para mejor rendimiento:
    - Reducir FPS_TARGET
    - Reducir segmentos de geometría
+   - Reducir LOD_MED_DISTANCE y LOD_FAR_DISTANCE
    - Reducir GRID_SIZE
 
 5. Para vista más cinematográfica:
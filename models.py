@@ -1,9 +1,58 @@
 #!/usr/bin/env python3
+import re
+import sys
+from array import array
 from dataclasses import dataclass, field
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional, Tuple
 
+# __slots__ en las dataclasses (menos memoria por comando en programas grandes);
+# dataclass(slots=True) solo existe desde Python 3.10
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
 
-@dataclass
+# Línea de G-Code con contenido: código, argumentos y comentario opcional tras ';'.
+# Se aplica en una sola pasada sobre el archivo completo ya decodificado; \s es el
+# mismo espacio Unicode que usan str.strip()/split() (p.ej. \xa0). Las líneas
+# vacías o con solo un comentario no coinciden y quedan descartadas.
+_GCODE_LINE_RE = re.compile(r"^[^\S\n]*([^\s;]+)([^;\n]*)(?:;([^\n]*))?", re.MULTILINE)
+
+
+def _scan_gcode(data: bytes) -> List[Tuple[str, str, str]]:
+    """Separa un bloque de G-Code (UTF-8) en filas (código, argumentos, comentario)."""
+    text = data.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+    return _GCODE_LINE_RE.findall(text)
+
+
+def _parse_args(rest: str) -> Dict[str, float]:
+    """Argumentos de un comando: la clave es el primer carácter de cada token en mayúsculas."""
+    args: Dict[str, float] = {}
+    for token in rest.split():
+        # Formato típico: X10.5, Y-2, F500
+        try:
+            args[token[0].upper()] = float(token[1:])
+        except ValueError:
+            # Valor no numérico (p.ej. S1000rpm): se ignora
+            continue
+    return args
+
+
+def _iter_gcode(rows: List[Tuple[str, str, str]]) -> Iterator[Tuple[str, Dict[str, float], str]]:
+    """Convierte las filas de _scan_gcode en (código, argumentos, comentario)."""
+    for code, rest, comment in rows:
+        yield code.upper(), _parse_args(rest), comment.strip()
+
+
+def _parse_gcode(data: bytes) -> List["GCodeCommand"]:
+    """
+    Parsea un bloque de G-Code (una o varias líneas, UTF-8) en comandos.
+
+    >>> [(c.code, c.args) for c in _parse_gcode("g1\\xa0x1\\n\\u2028 m5".encode("utf-8"))]
+    [('G1', {'X': 1.0}), ('M5', {})]
+    """
+    return [GCodeCommand(code=code, args=args, comment=comment)
+            for code, args, comment in _iter_gcode(_scan_gcode(data))]
+
+
+@dataclass(**_DATACLASS_SLOTS)
 class Vector3:
     x: float
     y: float
@@ -13,7 +62,7 @@ class Vector3:
         return {"x": float(self.x), "y": float(self.y), "z": float(self.z)}
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class GCodeCommand:
     code: str
     args: Dict[str, float] = field(default_factory=dict)
@@ -22,12 +71,13 @@ class GCodeCommand:
     def to_rpc(self) -> dict:
         return {
             "code": self.code,
-            "args": {str(k): float(v) for k, v in self.args.items()},
+            # _parse_gcode ya produce claves str y valores float: basta con copiar
+            "args": dict(self.args),
             "comment": self.comment,
         }
 
     @staticmethod
-    def from_line(line: str) -> "GCodeCommand":
+    def from_line(line: str) -> Optional["GCodeCommand"]:
         """
         Parseo simple de una línea de G-Code.
         Soporta ejemplos tipo:
@@ -35,39 +85,25 @@ class GCodeCommand:
           - G1 X10.5 Y-3.1 Z0.0 F500
           - M3 ; comentario
         No valida sintaxis completa de G-Code (lo mínimo para armar args).
+        La clave es el primer carácter del argumento en mayúsculas, sea o no una letra:
+
+        >>> GCodeCommand.from_line("g0 x1 *5 ñ2 S1000rpm").to_rpc()
+        {'code': 'G0', 'args': {'X': 1.0, '*': 5.0, 'Ñ': 2.0}, 'comment': ''}
+
+        Los espacios Unicode (p.ej. \\xa0) separan igual que un espacio:
+
+        >>> GCodeCommand.from_line("\\xa0 m5\\xa0S1000 ; fin").to_rpc()
+        {'code': 'M5', 'args': {'S': 1000.0}, 'comment': 'fin'}
         """
-        raw = line.strip()
-        if not raw:
-            return None  # línea vacía
-        # Remover comentarios ; o ( )
-        comment = ""
-        if ";" in raw:
-            raw, comment = raw.split(";", 1)
-            comment = comment.strip()
-        raw = raw.strip()
-        if not raw:
-            return None
-
-        parts = raw.split()
-        code = parts[0].upper()
-        args: Dict[str, float] = {}
-        for token in parts[1:]:
-            token = token.strip()
-            if not token:
-                continue
-            # Formato típico: X10.5, Y-2, F500
-            key = token[0].upper()
-            val = token[1:]
-            try:
-                args[key] = float(val)
-            except ValueError:
-                # Si no es número (p.ej. S1000 para spindle), intentamos float;
-                # si falla, lo ignoramos (o podrías guardarlo aparte).
-                continue
-        return GCodeCommand(code=code, args=args, comment=comment)
-
-
-@dataclass
+        raw, _, comment = line.partition(";")
+        parts = raw.split(None, 1)
+        if not parts:
+            return None  # línea vacía o solo comentario
+        rest = parts[1] if len(parts) > 1 else ""
+        return GCodeCommand(code=parts[0].upper(), args=_parse_args(rest), comment=comment.strip())
+
+
+@dataclass(**_DATACLASS_SLOTS)
 class GCodeProgram:
     id: str = ""
     ownerUserId: str = ""
@@ -87,10 +123,86 @@ class GCodeProgram:
         import os
 
         name = os.path.basename(path)
-        commands: List[GCodeCommand] = []
-        with open(path, "r", encoding="utf-8") as f:
-            for line in f:
-                cmd = GCodeCommand.from_line(line)
-                if cmd is not None:
-                    commands.append(cmd)
-        return GCodeProgram(id="", ownerUserId=owner_user_id, name=name, commands=commands)
\ No newline at end of file
+        # Lectura de una sola vez y parseo del archivo completo
+        with open(path, "rb") as f:
+            commands = _parse_gcode(f.read())
+        return GCodeProgram(id="", ownerUserId=owner_user_id, name=name, commands=commands)
+
+
+# Ejes con columna propia en GCodeProgramSoA
+_SOA_AXES = ("X", "Y", "Z", "F", "E", "S")
+
+
+@dataclass(**_DATACLASS_SLOTS)
+class GCodeProgramSoA:
+    """
+    Programa G-Code en formato columnar (estructura de arrays) para programas
+    grandes: en lugar de un objeto y un dict por comando, guarda una columna
+    array('d') por eje común, el índice de la lista de claves (en el orden del
+    archivo) de cada comando y, aparte, los argumentos poco frecuentes.
+    Produce el mismo to_rpc() que GCodeProgram, con los argumentos en el mismo orden.
+    """
+    id: str = ""
+    ownerUserId: str = ""
+    name: str = ""
+    codes: List[str] = field(default_factory=list)
+    comments: List[str] = field(default_factory=list)
+    # Listas de claves distintas, en orden de aparición; layout_ids[i] -> layouts[...]
+    layouts: List[Tuple[str, ...]] = field(default_factory=list)
+    layout_ids: array = field(default_factory=lambda: array("I"))
+    columns: Dict[str, array] = field(default_factory=lambda: {axis: array("d") for axis in _SOA_AXES})
+    # Índice de comando -> argumentos fuera de _SOA_AXES
+    extras: Dict[int, Dict[str, float]] = field(default_factory=dict)
+
+    def to_rpc(self) -> dict:
+        # Cada columna se convierte a floats de Python de una sola vez (en C)
+        values = {axis: column.tolist() for axis, column in self.columns.items()}
+        # Columna de cada clave (None: está en extras), una vez por lista de claves
+        plans = [[(key, values.get(key)) for key in keys] for keys in self.layouts]
+        extras = self.extras
+        commands = []
+        for i, layout_id in enumerate(self.layout_ids):
+            extra = extras.get(i)
+            args = {key: column[i] if column is not None else extra[key]
+                    for key, column in plans[layout_id]}
+            commands.append({"code": self.codes[i], "args": args, "comment": self.comments[i]})
+        return {
+            "id": self.id,
+            "ownerUserId": self.ownerUserId,
+            "name": self.name,
+            "commands": commands,
+        }
+
+    @staticmethod
+    def load_from_file(path: str, owner_user_id: str = "") -> "GCodeProgramSoA":
+        import os
+
+        with open(path, "rb") as f:
+            rows = _scan_gcode(f.read())
+
+        # Columnas reservadas de antemano según la cantidad de comandos
+        count = len(rows)
+        program = GCodeProgramSoA(id="", ownerUserId=owner_user_id, name=os.path.basename(path))
+        program.layout_ids = array("I", [0]) * count
+        program.columns = {axis: array("d", bytes(8 * count)) for axis in _SOA_AXES}
+
+        codes, comments, layouts, layout_ids, columns, extras = (
+            program.codes, program.comments, program.layouts, program.layout_ids,
+            program.columns, program.extras)
+        layout_index: Dict[Tuple[str, ...], int] = {}
+        for i, (code, args, comment) in enumerate(_iter_gcode(rows)):
+            codes.append(code)
+            comments.append(comment)
+            for key, value in args.items():
+                column = columns.get(key)
+                if column is None:
+                    extras.setdefault(i, {})[key] = value
+                else:
+                    column[i] = value
+            keys = tuple(args)
+            layout_id = layout_index.get(keys)
+            if layout_id is None:
+                layout_id = layout_index[keys] = len(layouts)
+                layouts.append(keys)
+            layout_ids[i] = layout_id
+        return program
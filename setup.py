@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""
+Compilación opcional de auth_core con mypyc
+
+    pip install mypy
+    python setup.py build_ext --inplace
+
+Genera auth_core.*.so junto a auth_core.py; Python importa el módulo compilado
+en lugar del fuente, así que los scripts no cambian. Sin mypyc no se compila
+nada y se sigue usando auth_core.py.
+"""
+
+from setuptools import setup
+
+try:
+    from mypyc.build import mypycify
+    # Solo se compila (y se verifica con mypy) auth_core: sus imports se toman como Any
+    ext_modules = mypycify(["--follow-imports=skip", "auth_core.py"])
+except ImportError:
+    ext_modules = []
+
+setup(
+    name="cliente-python-robot",
+    py_modules=["auth_core", "cli", "client_api", "config", "models"],
+    ext_modules=ext_modules,
+)
@@ -5,79 +5,115 @@ Replica la funcionalidad del método CLIHandler::login() del cliente C++
 """
 
 try:
-    from client_api import RobotRpcClient
-    from config import RPC_ENDPOINT
+    from client_api import RobotRpcClient, get_client, resolve_address, forget_address
+    from config import RPC_ENDPOINT, RPC_TIMEOUT, PROBE_TIMEOUT
+    from auth_core import (UserRole, connect_with_retry, login_authenticate,
+                           interpret_auth_result, interpret_auth_error)
 except ImportError:
-    from .client_api import RobotRpcClient
-    from .config import RPC_ENDPOINT
+    from .client_api import RobotRpcClient, get_client, resolve_address, forget_address
+    from .config import RPC_ENDPOINT, RPC_TIMEOUT, PROBE_TIMEOUT
+    from .auth_core import (UserRole, connect_with_retry, login_authenticate,
+                            interpret_auth_result, interpret_auth_error)
 
+import errno
+import selectors
+import socket
+import sys
+import urllib.parse
 import xmlrpc.client
-from enum import IntEnum
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
 
 
-class UserRole(IntEnum):
-    """Roles de usuario según el servidor"""
-    OPERATOR = 0
-    ADMIN = 1
+def multicall_connect(client: RobotRpcClient, credentials: list[tuple[str, str]]) -> Optional[list]:
+    """
+    Envía todos los robot.connect en una sola llamada system.multicall
+    (un viaje de ida y vuelta en lugar de uno por credencial)
+    
+    Retorna:
+        list: respuesta de cada credencial (struct o xmlrpc.client.Fault), en orden;
+              None si el servidor no soporta multicall o la llamada falló
+    """
+    multicall = xmlrpc.client.MultiCall(client.proxy)
+    for username, password in credentials:
+        multicall.robot.connect(username, password)
+    
+    try:
+        responses = multicall()
+    except (xmlrpc.client.Error, OSError):
+        return None
+    
+    # Una lista con un resultado por llamada; si no, se usa el camino paralelo
+    if not isinstance(responses.results, list) or len(responses.results) != len(credentials):
+        return None
+    
+    # Cada entrada puede ser un Fault propio sin afectar al resto
+    results = []
+    for i in range(len(credentials)):
+        try:
+            results.append(responses[i])
+        except xmlrpc.client.Fault as f:
+            results.append(f)
+        except ValueError:
+            # Entrada que no es [resultado] ni un struct de Fault
+            return None
+    return results
 
 
-def login_authenticate(client: RobotRpcClient, username: str, password: str) -> tuple[bool, dict]:
+def parallel_connect(credentials: list[tuple[str, str]], endpoint: str = RPC_ENDPOINT,
+                     retry_refused: bool = False) -> list:
     """
-    Autenticación usando robot.authenticate (método directo del servidor)
+    Envía los robot.connect en paralelo, con un cliente por hilo (ServerProxy no es
+    seguro entre hilos): el tiempo total es el de la llamada más lenta y no la suma.
+    Cada llamada reintenta los errores transitorios (ver connect_with_retry)
     
     Retorna:
-        tuple: (success: bool, info: dict)
-        info contiene: authenticated, role, username
+        list: respuesta de cada credencial (struct o la excepción obtenida), en orden
     """
-    try:
-        # Llamar directamente al método robot.authenticate
-        result = client.proxy.robot.connect(username, password)
-        
-        # El servidor devuelve un struct con:
-        # - authenticated: bool
-        # - role: int (0=OPERATOR, 1=ADMIN)
-        
-        if isinstance(result, dict):
-            is_authenticated = result.get("authenticated", False)
-            
-            if is_authenticated:
-                role_int = result.get("role", 0)
-                role = UserRole(role_int)
-                role_str = "Administrador" if role == UserRole.ADMIN else "Operador"
-                
-                print(f"¡Inicio de sesión exitoso! Bienvenido, {username} ({role_str}).")
-                
-                return True, {
-                    "authenticated": True,
-                    "username": username,
-                    "password": password,  # En producción NO almacenar contraseñas
-                    "role": role,
-                    "role_str": role_str
-                }
-            else:
-                print("Error: Usuario o clave incorrectos.")
-                return False, {"authenticated": False}
-        else:
-            print(f"Error: Respuesta inesperada del servidor: {result}")
-            return False, {"authenticated": False}
-            
-    except xmlrpc.client.Fault as f:
-        print(f"[CLI] Error de autenticación RPC: {f.faultString}")
-        return False, {"authenticated": False, "error": str(f)}
-    except (ConnectionRefusedError, OSError) as e:
-        print(f"[CLI] Error de conexión con el servidor: {e}")
-        print("Asegúrese de que el servidor esté corriendo ('make run').")
-        return False, {"authenticated": False, "error": str(e)}
-    except Exception as e:
-        print(f"[CLI] Error inesperado: {type(e).__name__}: {e}")
-        return False, {"authenticated": False, "error": str(e)}
+    def connect(credential: tuple[str, str]):
+        client = RobotRpcClient(endpoint)
+        try:
+            return connect_with_retry(client, *credential, retry_refused)
+        except Exception as e:
+            return e
+        finally:
+            client.close()
+    
+    with ThreadPoolExecutor(max_workers=len(credentials)) as executor:
+        return list(executor.map(connect, credentials))
+
 
+# connect_ex en un socket no bloqueante devuelve uno de estos códigos mientras conecta
+_CONNECT_PENDING = {errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EAGAIN, getattr(errno, "WSAEWOULDBLOCK", errno.EWOULDBLOCK)}
 
-def check_server_connectivity(endpoint: str) -> bool:
-    """Verifica si el servidor es alcanzable antes de autenticar"""
-    import socket
-    import urllib.parse
+
+def _connect_nonblocking(sock: socket.socket, sockaddr, timeout: float) -> int:
+    """
+    Conecta el socket sin bloquear el hilo y espera con un selector a que termine
     
+    Retorna:
+        int: 0 si conectó; si no, el código errno (un rechazo llega al instante, sin
+             esperar el timeout; ETIMEDOUT si el timeout se agotó)
+    """
+    sock.setblocking(False)
+    result = sock.connect_ex(sockaddr)
+    if result in _CONNECT_PENDING:
+        with selectors.DefaultSelector() as selector:
+            selector.register(sock, selectors.EVENT_WRITE)
+            if not selector.select(timeout):
+                return errno.ETIMEDOUT
+        result = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+    return result
+
+
+def check_server_connectivity(endpoint: str) -> tuple[bool, Optional[socket.socket]]:
+    """
+    Verifica si el servidor es alcanzable antes de autenticar
+    
+    Retorna:
+        tuple: (alcanzable, socket ya conectado para reutilizar como primera conexión RPC
+                o None si no lo es)
+    """
     parsed = urllib.parse.urlparse(endpoint)
     host = parsed.hostname
     port = parsed.port or 8080
@@ -85,28 +121,32 @@ def check_server_connectivity(endpoint: str) -> bool:
     print(f"Verificando conectividad con {host}:{port}...")
     
     try:
-        # Intentar conexión TCP básica
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(5)
-        result = sock.connect_ex((host, port))
-        sock.close()
+        # Intentar conexión TCP básica (la resolución queda en caché para el cliente RPC)
+        for family, socktype, proto, _, sockaddr in resolve_address(host, port):
+            sock = socket.socket(family, socktype, proto)
+            result = _connect_nonblocking(sock, sockaddr, PROBE_TIMEOUT)
+            if result == 0:
+                break
+            sock.close()
         
         if result == 0:
+            # El socket queda abierto: el cliente RPC lo usa en lugar de reconectar
             print(f"✓ Puerto {port} accesible en {host}")
-            return True
+            return True, sock
+        
+        forget_address(host, port)
+        if result == errno.ETIMEDOUT:
+            print(f"✗ Timeout conectando a {host}:{port}")
         else:
             print(f"✗ Puerto {port} no accesible en {host}")
             print(f"  Código de error: {result}")
-            return False
+        return False, None
     except socket.gaierror:
         print(f"✗ No se puede resolver el hostname: {host}")
-        return False
-    except socket.timeout:
-        print(f"✗ Timeout conectando a {host}:{port}")
-        return False
+        return False, None
     except Exception as e:
         print(f"✗ Error verificando conectividad: {e}")
-        return False
+        return False, None
 
 
 def test_authenticate():
@@ -118,7 +158,8 @@ def test_authenticate():
     print()
     
     # Verificar conectividad primero
-    if not check_server_connectivity(RPC_ENDPOINT):
+    reachable, sock = check_server_connectivity(RPC_ENDPOINT)
+    if not reachable:
         print()
         print("="*60)
         print("ERROR: No se puede conectar al servidor")
@@ -132,8 +173,16 @@ def test_authenticate():
         print()
         print("Para cambiar el servidor, edita config.py o usa:")
         print("  export ROBOT_RPC_ENDPOINT='http://NUEVA_IP:PUERTO/RPC2'")
+        print()
+        print("Timeouts en segundos (opcionales):")
+        print(f"  export ROBOT_PROBE_TIMEOUT={PROBE_TIMEOUT:g}  (prueba de conectividad)")
+        print(f"  export ROBOT_RPC_TIMEOUT={RPC_TIMEOUT:g}  (cada llamada RPC)")
         return False
     
+    # Mientras el usuario escribe, una conexión abierta y ociosa bloquearía a un
+    # servidor de un solo hilo o podría cerrarse por inactividad: aquí no se reutiliza
+    sock.close()
+    
     print()
     # Solicitar credenciales al usuario
     username = input("Usuario: ").strip()
@@ -142,11 +191,11 @@ def test_authenticate():
     print()
     print("Conectando al servidor...")
     
-    # Crear cliente
-    client = RobotRpcClient()
+    # Cliente compartido del proceso
+    client = get_client(RPC_ENDPOINT)
     
     # Intentar autenticación
-    success, info = login_authenticate(client, username, password)
+    success, info = login_authenticate(client, username, password, retry_refused=True)
     
     print()
     print("="*60)
@@ -176,7 +225,8 @@ def test_authenticate_batch():
     print()
     
     # Verificar conectividad primero
-    if not check_server_connectivity(RPC_ENDPOINT):
+    reachable, sock = check_server_connectivity(RPC_ENDPOINT)
+    if not reachable:
         print()
         print("="*60)
         print("ERROR: No se puede conectar al servidor")
@@ -194,15 +244,31 @@ def test_authenticate_batch():
         ("user", "user"),
     ]
     
-    client = RobotRpcClient()
+    # Cliente compartido: todas las pruebas (y las siguientes ejecuciones en este
+    # proceso) usan la misma conexión TCP, que se cierra al salir
+    client = get_client(RPC_ENDPOINT, prewarmed_socket=sock)
     results = []
     
-    for username, password in test_credentials:
-        print(f"\nProbando: {username} / {'*' * len(password)}")
-        print("-" * 40)
-        success, info = login_authenticate(client, username, password)
+    # Todas las credenciales en una sola llamada; sin multicall, en paralelo.
+    # Las respuestas se informan después y en orden para no mezclar la salida
+    responses = multicall_connect(client, test_credentials)
+    if responses is None:
+        client.close()  # No retener la conexión mientras trabajan los hilos
+        responses = parallel_connect(test_credentials, retry_refused=True)
+    for (username, password), response in zip(test_credentials, responses):
+        # Los mensajes de cada credencial se escriben juntos con una sola llamada
+        logs = [f"\nProbando: {username} / {'*' * len(password)}", "-" * 40]
+        if isinstance(response, Exception):
+            success, info = interpret_auth_error(response, logs)
+        else:
+            try:
+                success, info = interpret_auth_result(response, username, password, logs)
+            except Exception as e:
+                # Respuesta inválida (p.ej. rol desconocido): falla solo esta credencial
+                success, info = interpret_auth_error(e, logs)
         results.append((username, password, success, info))
-        print()
+        logs.append("")
+        sys.stdout.write("\n".join(logs) + "\n")
     
     # Resumen
     print("="*60)
@@ -224,8 +290,6 @@ def test_authenticate_batch():
 
 
 if __name__ == "__main__":
-    import sys
-    
     # Determinar modo según argumentos
     if len(sys.argv) > 1 and sys.argv[1] == "--batch":
         # Modo batch: prueba automática con credenciales predefinidas
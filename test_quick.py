@@ -10,6 +10,7 @@ except ImportError:
     from .client_api import RobotRpcClient
     from .config import RPC_ENDPOINT
 
+import sys
 import xmlrpc.client
 
 def test_connection():
@@ -60,6 +61,5 @@ def test_connection():
         return False
 
 if __name__ == "__main__":
-    import sys
     success = test_connection()
     sys.exit(0 if success else 1)